@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""SpeechJammer.callback ölçüm aracı
+
+Ses kartı olmadan çalışır: deneme.py, deneme copy.py ve deneme copy 2.py
+içindeki SpeechJammer sınıflarını yükler, callback'leri sentetik
+indata/outdata bloklarıyla çağırır ve her durum için callback süresini
+blok süresinin yüzdesi olarak raporlar (p50/p99/max). Ayrıca çıkışın
+beklenen gecikmeli sinyalle aynı olup olmadığını kontrol eder.
+--split ile ayrı akış yolu ölçülür: input_callback ve output_callback
+StreamLink üzerinden, iki akışın blok süreleriyle sıralanarak çağrılır
+(--input-rate farklıysa giriş hız çevrilir). Bu yolda çıkış saat kayması
+düzeltmesiyle aradeğerlendiği için eşdeğerlik yerine giriş callback'inin
+p99'u, tahmin edilen kayma ve halka sayaçları gösterilir (ölçüm gerçek
+zamandan hızlı koştuğu için kayma yaklaşıktır; saat kayması denetiminin
+doğruluğu için bench_drift.py).
+
+Kullanım:
+    python3 bench_callback.py
+    python3 bench_callback.py --variants copy --blocksizes 128 256 --max-p99 25
+    python3 bench_callback.py --variants copy --profile-stages
+    python3 bench_callback.py --variants copy copy2 --split --input-rate 44100 --rates 48000
+
+Her varyant için ayrıca 4 kanallı girişte 3. kanalı sol kulağa veren
+[(2, 0)] yönlendirmesi denenir ve çıkışı kontrol edilir.
+
+Herhangi bir durumda p99 sınırı aşılırsa veya çıkış uyuşmazsa çıkış kodu 1
+olur, böylece regresyon kontrolü olarak kullanılabilir.
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+import types
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from dsp_chain import profile_text
+from stream_link import StreamLink
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+BLOCKSIZES = [64, 128, 256, 512, 1024, 2048]
+CHANNELS = [1, 2, 4]
+SAMPLE_RATES = [16000, 44100, 48000]
+OUTPUT_CHANNELS = 2
+WARMUP_BLOCKS = 10
+ROUTE_CHECK = [(2, 0)]  # 3. mikrofon kanalı sadece sol kulağa
+
+
+def stub_missing(name):
+    """Ses kartı/klavye olmayan makinede eksik modülün yerine boş modül koy"""
+    try:
+        __import__(name)
+    except (ImportError, OSError):
+        # sounddevice PortAudio bulamazsa OSError verir
+        sys.modules[name] = types.ModuleType(name)
+
+
+def load_script(filename):
+    """Dosya adında boşluk olan betiği modül olarak yükle"""
+    if HERE not in sys.path:
+        sys.path.insert(0, HERE)
+    stub_missing('sounddevice')
+    stub_missing('keyboard')
+    name = os.path.splitext(filename)[0].replace(' ', '_')
+    spec = importlib.util.spec_from_file_location(name, os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def setup_deneme(module, sample_rate, blocksize, input_channels, output_channels, routes=None):
+    jammer = module.SpeechJammer(routes=routes)
+    jammer.sample_rate = sample_rate
+    jammer.blocksize = blocksize
+    jammer.input_channels = input_channels
+    jammer.channels = output_channels
+    jammer.allocate_buffers()
+    return jammer
+
+
+def setup_copy(module, sample_rate, blocksize, input_channels, output_channels, routes=None):
+    jammer = module.SpeechJammer(routes=routes)
+    jammer.sample_rate = sample_rate
+    jammer.blocksize = blocksize
+    jammer.input_channels = input_channels
+    jammer.channels = output_channels
+    jammer.allocate_buffers()
+    jammer.running = True  # Çıkış açık, SPACE'e basılmış gibi
+    jammer.publish()
+    return jammer
+
+
+def setup_copy2(module, sample_rate, blocksize, input_channels, output_channels, routes=None):
+    jammer = module.SpeechJammer(routes=routes)
+    jammer.sample_rate = sample_rate
+    jammer.blocksize = blocksize
+    jammer.allocate_buffers(input_channels, output_channels)
+    jammer.running = True  # Çıkış açık, SPACE'e basılmış gibi
+    jammer.publish()
+    return jammer
+
+
+# Varyant adı -> (dosya, kurulum fonksiyonu)
+VARIANTS = {
+    'deneme': ('deneme.py', setup_deneme),
+    'copy': ('deneme copy.py', setup_copy),
+    'copy2': ('deneme copy 2.py', setup_copy2),
+}
+
+
+def expected_output(jammer, signal, sample_rate):
+    """Çıkışın ilk kanalında beklenen sinyal: gecikmiş ve şiddeti ayarlanmış giriş"""
+    delay = int(jammer.delay * sample_rate)
+    gain = getattr(jammer, 'feedback_gain', 1.0)
+    if getattr(jammer, 'invert_phase', False):
+        gain = -gain
+    expected = np.zeros_like(signal)
+    if delay < len(signal):
+        expected[delay:] = signal[:len(signal) - delay] * np.float32(gain)
+    return expected
+
+
+def run_case(variant, module, sample_rate, blocksize, input_channels, seconds, rng, profile=False, routes=None):
+    """Tek bir durumu çalıştır, süre yüzdelerini ve eşdeğerlik sonucunu döndür"""
+    filename, setup = VARIANTS[variant]
+    jammer = setup(module, sample_rate, blocksize, input_channels, OUTPUT_CHANNELS, routes)
+    chain = getattr(jammer, 'output_chain', None)
+    profiler = chain.profile(True) if profile and chain is not None else None
+
+    delay_blocks = int(jammer.delay * sample_rate) // blocksize + 1
+    blocks = WARMUP_BLOCKS + max(delay_blocks * 2, int(seconds * sample_rate / blocksize))
+    # Tüm giriş kanallarında aynı sinyal: her kanal eşleme kuralı ilk
+    # çıkış kanalına aynı sinyali koyar
+    signal = rng.uniform(-0.5, 0.5, blocks * blocksize).astype(np.float32)
+    indata = np.repeat(signal[:, np.newaxis], input_channels, axis=1)
+    if routes is not None:
+        # Sinyal sadece yönlendirilen kanallarda: yanlış kanal okunursa çıkış sessiz kalır
+        unused = np.ones(input_channels, dtype=bool)
+        unused[[route[0] for route in routes]] = False
+        indata[:, unused] = 0
+    outdata = np.zeros((blocks * blocksize, OUTPUT_CHANNELS), dtype=np.float32)
+
+    durations = np.zeros(blocks)
+    for i in range(blocks):
+        block = slice(i * blocksize, (i + 1) * blocksize)
+        start = time.perf_counter()
+        jammer.callback(indata[block], outdata[block], blocksize, None, None)
+        durations[i] = time.perf_counter() - start
+
+    period = blocksize / sample_rate
+    percent = durations[WARMUP_BLOCKS:] / period * 100
+    expected = expected_output(jammer, signal, sample_rate)
+    error = float(np.max(np.abs(outdata[:, 0] - expected)))
+    return {
+        'p50': float(np.percentile(percent, 50)),
+        'p99': float(np.percentile(percent, 99)),
+        'max': float(np.max(percent)),
+        'error': error,
+        'equivalent': error <= 1e-6,
+        'stages': profiler.snapshot() if profiler is not None else None,
+    }
+
+
+def run_split_case(variant, module, sample_rate, blocksize, input_channels, seconds, rng, input_rate=None):
+    """Ayrı akış yolu: giriş ve çıkış callback'lerini StreamLink üzerinden sırayla çağır"""
+    filename, setup = VARIANTS[variant]
+    jammer = setup(module, sample_rate, blocksize, input_channels, OUTPUT_CHANNELS)
+    input_rate = input_rate or sample_rate
+    jammer.link = StreamLink(input_rate, sample_rate, OUTPUT_CHANNELS, blocksize, blocksize, dtype=np.float32)
+    jammer.publish()  # Gecikme hattı bağlantı gecikmesi kadar kısalır
+
+    input_period = blocksize / input_rate
+    output_period = blocksize / sample_rate
+    inputs = int(seconds * input_rate / blocksize) + 1
+    signal = rng.uniform(-0.5, 0.5, (inputs * blocksize, input_channels)).astype(np.float32)
+    outdata = np.zeros((blocksize, OUTPUT_CHANNELS), dtype=np.float32)
+
+    input_durations = []
+    output_durations = []
+    i = j = 0
+    # İki akışın blokları kendi saatlerine göre sıralanır
+    while i < inputs:
+        if (i + 1) * input_period <= j * output_period:
+            block = signal[i * blocksize:(i + 1) * blocksize]
+            start = time.perf_counter()
+            jammer.input_callback(block, blocksize, None, None)
+            input_durations.append(time.perf_counter() - start)
+            i += 1
+        else:
+            start = time.perf_counter()
+            jammer.output_callback(outdata, blocksize, None, None)
+            output_durations.append(time.perf_counter() - start)
+            j += 1
+
+    output_percent = np.array(output_durations[WARMUP_BLOCKS:]) / output_period * 100
+    input_percent = np.array(input_durations[WARMUP_BLOCKS:]) / input_period * 100
+    ring = jammer.link.ring
+    return {
+        'p50': float(np.percentile(output_percent, 50)),
+        'p99': float(np.percentile(output_percent, 99)),
+        'max': float(np.max(output_percent)),
+        'input_p99': float(np.percentile(input_percent, 99)),
+        'drift': jammer.link.drift_ppm(),
+        'ring': (ring.overruns, ring.underruns, jammer.link.realigns),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SpeechJammer.callback gerçek zaman ölçümü")
+    parser.add_argument('--variants', nargs='+', choices=sorted(VARIANTS), default=sorted(VARIANTS))
+    parser.add_argument('--blocksizes', nargs='+', type=int, default=BLOCKSIZES)
+    parser.add_argument('--channels', nargs='+', type=int, default=CHANNELS)
+    parser.add_argument('--rates', nargs='+', type=int, default=SAMPLE_RATES)
+    parser.add_argument('--seconds', type=float, default=2.0, help="durum başına sentetik ses süresi")
+    parser.add_argument('--max-p99', type=float, default=50.0, help="blok süresinin yüzdesi olarak p99 sınırı")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--profile-stages', action='store_true', help="çıkış zincirinin aşama sürelerini göster")
+    parser.add_argument('--split', action='store_true', help="ayrı giriş/çıkış akışı yolunu ölç (copy, copy2)")
+    parser.add_argument('--input-rate', type=int, default=None, help="--split ile giriş akışının hızı (varsayılan çıkışla aynı)")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    failed = False
+    print(f"{'varyant':<8} {'hz':>6} {'blok':>5} {'kanal':>5} {'p50%':>7} {'p99%':>7} {'max%':>7}  çıkış")
+    for variant in args.variants:
+        module = load_script(VARIANTS[variant][0])
+        if args.split and not hasattr(module.SpeechJammer, 'input_callback'):
+            print(f"{variant:<8} ayrı akış yolu yok, atlandı")
+            continue
+        for sample_rate in args.rates:
+            for blocksize in args.blocksizes:
+                for channels in args.channels:
+                    if args.split:
+                        result = run_split_case(variant, module, sample_rate, blocksize, channels,
+                                                args.seconds, rng, args.input_rate)
+                        slow = max(result['p99'], result['input_p99']) > args.max_p99
+                        failed = failed or slow
+                        mark = " !" if slow else ""
+                        print(f"{variant:<8} {sample_rate:>6} {blocksize:>5} {channels:>5} "
+                              f"{result['p50']:>7.2f} {result['p99']:>7.2f} {result['max']:>7.2f}  "
+                              f"giriş p99 {result['input_p99']:.2f} - kayma {result['drift']:+.0f} ppm - "
+                              f"halka {'/'.join(map(str, result['ring']))}{mark}")
+                        continue
+                    result = run_case(variant, module, sample_rate, blocksize, channels, args.seconds, rng, args.profile_stages)
+                    slow = result['p99'] > args.max_p99
+                    failed = failed or slow or not result['equivalent']
+                    check = "OK" if result['equivalent'] else f"FARKLI ({result['error']:.3g})"
+                    mark = " !" if slow else ""
+                    print(f"{variant:<8} {sample_rate:>6} {blocksize:>5} {channels:>5} "
+                          f"{result['p50']:>7.2f} {result['p99']:>7.2f} {result['max']:>7.2f}  {check}{mark}")
+                    if result['stages']:
+                        print(f"{'':<8} aşamalar (ortalama/en büyük): {profile_text(result['stages'])}")
+        if args.split:
+            continue
+        # 2. kanaldan sonraki bir mikrofon: sinyal sadece o kanalda, sol çıkışta beklenir
+        result = run_case(variant, module, args.rates[0], args.blocksizes[0], 4, args.seconds, rng, routes=ROUTE_CHECK)
+        failed = failed or not result['equivalent']
+        check = "OK" if result['equivalent'] else f"FARKLI ({result['error']:.3g})"
+        print(f"{variant:<8} yönlendirme {ROUTE_CHECK} (4 giriş kanalı)  {check}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
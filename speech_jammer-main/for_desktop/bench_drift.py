@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""StreamLink saat kayması denetiminin çevrimdışı benzetimi
+
+Ses kartı olmadan çalışır: giriş ve çıkış callback'leri zaman damgalı
+olarak benzetilir. Giriş saati çıkışa göre --ppm kadar hızlı/yavaş
+çalışır ve her callback 0..--jitter saniye geç gelir. Giriş sinyali her
+örneğin yakalanma zamanıdır. Böylece çıkıştan okunan her değer, o
+örneğin çalındığı anla karşılaştırılınca uçtan uca gecikmeyi verir
+(polifaz filtre ve doğrusal aradeğerleme rampayı bozmaz). Isınmadan
+sonra her durum için gecikmenin ortalaması ve sapması (± ms),
+tahmin edilen kayma ve halka sayaçları raporlanır.
+
+Kullanım:
+    python3 bench_drift.py
+    python3 bench_drift.py --pairs 48000:44100 --ppm 200 --seconds 3600
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from stream_link import StreamLink
+
+PAIRS = ['48000:48000', '48000:44100']
+PPMS = [-300.0, 0.0, 200.0, 1000.0]
+
+
+def simulate(in_rate, out_rate, ppm, seconds, blocksize, jitter, settle, rng):
+    """Tek durumu benzet: (ortalama gecikme, sapma, tahmin ppm, sayaçlar) döndür"""
+    # float64: saniye cinsinden zaman damgası bir saat boyunca hassas kalır
+    link = StreamLink(in_rate, out_rate, 1, blocksize, blocksize, dtype=np.float64)
+    true_rate = in_rate * (1 + ppm * 1e-6)
+    input_period = blocksize / true_rate
+    output_period = blocksize / out_rate
+    offsets = np.arange(blocksize)
+    block = np.zeros((blocksize, 1))
+    out = np.zeros((blocksize, 1))
+    delay = np.zeros(blocksize)
+
+    low, high, total, count = np.inf, -np.inf, 0.0, 0
+    i = j = 0
+    while j * output_period < seconds:
+        ready = (i + 1) * input_period  # Bloğun son örneği yakalandığında
+        play = j * output_period
+        if ready <= play:
+            np.divide(offsets + i * blocksize, true_rate, out=block[:, 0])
+            link.write(block, now=ready + rng.uniform(0, jitter))
+            i += 1
+            continue
+        if link.read(out, now=play + rng.uniform(0, jitter)) and play >= settle:
+            # Gecikme = çalınma anı - yakalanma anı
+            np.divide(offsets, out_rate, out=delay)
+            delay += play
+            delay -= out[:, 0]
+            low = min(low, delay.min())
+            high = max(high, delay.max())
+            total += delay.sum()
+            count += blocksize
+        j += 1
+    mean = total / max(count, 1)
+    ring = link.ring
+    return {
+        'mean': mean * 1000,
+        'spread': max(high - mean, mean - low) * 1000,
+        'drift': link.drift_ppm(),
+        'ring': (ring.overruns, ring.underruns, link.realigns),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="StreamLink saat kayması denetimi benzetimi")
+    parser.add_argument('--pairs', nargs='+', default=PAIRS, help="giriş:çıkış hızları")
+    parser.add_argument('--ppm', nargs='+', type=float, default=PPMS, help="giriş saatinin kayması")
+    parser.add_argument('--seconds', type=float, default=300.0, help="durum başına benzetilen süre")
+    parser.add_argument('--settle', type=float, default=30.0, help="ölçüme katılmayan ısınma süresi")
+    parser.add_argument('--blocksize', type=int, default=256)
+    parser.add_argument('--jitter', type=float, default=0.001, help="callback zamanlama titremesi (saniye)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'giriş':>6} {'çıkış':>6} {'ppm':>7} {'gecikme ms':>11} {'± ms':>7} {'tahmin ppm':>11}  halka")
+    for pair in args.pairs:
+        in_rate, out_rate = (int(rate) for rate in pair.split(':'))
+        for ppm in args.ppm:
+            result = simulate(in_rate, out_rate, ppm, args.seconds, args.blocksize, args.jitter, args.settle, rng)
+            print(f"{in_rate:>6} {out_rate:>6} {ppm:>+7.0f} {result['mean']:>11.2f} {result['spread']:>7.3f} "
+                  f"{result['drift']:>+11.0f}  {'/'.join(map(str, result['ring']))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
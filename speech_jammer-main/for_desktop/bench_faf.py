@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""FAF (PitchShifter) blok başına CPU maliyeti ölçümü
+
+Her FFT boyutu için PitchShifter.process'i sentetik bloklarla çağırır ve
+süreyi blok süresinin yüzdesi olarak raporlar (p50/p99/max). Bir blokta
+pencere işlenip işlenmemesine göre süre değiştiği için p99 ve max, FFT
+yapılan blokların maliyetini gösterir.
+
+Kullanım:
+    python3 bench_faf.py
+    python3 bench_faf.py --fft-sizes 512 1024 --blocksizes 128 --rate 48000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pitch_shift import PitchShifter
+
+FFT_SIZES = [256, 512, 1024, 2048, 4096]
+BLOCKSIZES = [128, 256, 512]
+WARMUP_BLOCKS = 20
+
+
+def run_case(fft_size, blocksize, sample_rate, channels, semitones, seconds, rng):
+    """Tek bir FFT boyutu/blok boyutu için süre yüzdelerini döndür"""
+    shifter = PitchShifter(semitones, fft_size, channels=channels)
+    blocks = WARMUP_BLOCKS + max(int(seconds * sample_rate / blocksize), 4 * fft_size // blocksize)
+    audio = rng.uniform(-0.5, 0.5, (blocks * blocksize, channels)).astype(np.float32)
+
+    durations = np.zeros(blocks)
+    for i in range(blocks):
+        block = audio[i * blocksize:(i + 1) * blocksize]
+        start = time.perf_counter()
+        shifter.process(block, block)
+        durations[i] = time.perf_counter() - start
+
+    percent = durations[WARMUP_BLOCKS:] / (blocksize / sample_rate) * 100
+    return {
+        'p50': float(np.percentile(percent, 50)),
+        'p99': float(np.percentile(percent, 99)),
+        'max': float(np.max(percent)),
+        'mean': float(np.mean(percent)),
+        'latency_ms': shifter.latency / sample_rate * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FAF blok başına CPU maliyeti")
+    parser.add_argument('--fft-sizes', nargs='+', type=int, default=FFT_SIZES)
+    parser.add_argument('--blocksizes', nargs='+', type=int, default=BLOCKSIZES)
+    parser.add_argument('--rate', type=int, default=48000)
+    parser.add_argument('--channels', type=int, default=2)
+    parser.add_argument('--semitones', type=float, default=3)
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'fft':>5} {'blok':>5} {'ort%':>7} {'p50%':>7} {'p99%':>7} {'max%':>7} {'gecikme':>9}")
+    for fft_size in args.fft_sizes:
+        for blocksize in args.blocksizes:
+            result = run_case(fft_size, blocksize, args.rate, args.channels, args.semitones, args.seconds, rng)
+            print(f"{fft_size:>5} {blocksize:>5} {result['mean']:>7.2f} {result['p50']:>7.2f} "
+                  f"{result['p99']:>7.2f} {result['max']:>7.2f} {result['latency_ms']:>7.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Arayüz/CPU yükü altında callback jitter'ı: aynı süreç ve ayrı motor süreci
+
+Ses kartı olmadan çalışır: SpeechJammer.callback'i PortAudio gibi kendi
+thread'inde blok süresi aralıklarla çağıran bir saat sürücüsü kurulur.
+Aynı anda denetleyici süreçte sentetik arayüz thread'leri (saf Python
+iş patlamaları, GIL'i tutar) ve istenirse CPU'yu meşgul eden süreçler
+çalışır. Her mod için callback'in başlama gecikmesi (jitter) p99 ve en
+kötü değeri, en büyük callback süresi ve bir bloktan fazla geciken
+(gerçek akışta xrun olacak) blok sayısı raporlanır:
+  - thread:  motor arayüzle aynı süreçte, GIL paylaşılır
+  - process: motor engine_process ile ayrı süreçte
+  - process-rt: ayrı süreç, SCHED_FIFO + mlockall (--realtime ile, yetki gerekir)
+
+Kullanım:
+    python3 bench_isolation.py
+    python3 bench_isolation.py --ui-threads 4 --burst-ms 20 --cpu-load 2 --realtime
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+
+from bench_callback import load_script, stub_missing
+
+stub_missing('sounddevice')
+stub_missing('keyboard')
+from engine_process import EngineProcess, priority_text
+
+SCRIPT = 'deneme copy.py'
+
+
+class ClockedStream:
+    """Ses kartı yerine: callback'i kendi thread'inde blok süresi aralıklarla çağır
+
+    Bir bloktan fazla geç başlayan çağrılara output_underflow bayrağı
+    verilir, böylece geç bloklar CallbackMonitor'da xrun olarak sayılır.
+    """
+    def __init__(self, callback, sample_rate, blocksize, channels, seed=0):
+        self.callback = callback
+        self.period = blocksize / sample_rate
+        self.blocksize = blocksize
+        rng = np.random.default_rng(seed)
+        self.signal = rng.uniform(-0.5, 0.5, (sample_rate, channels)).astype(np.float32)
+        self.outdata = np.zeros((blocksize, channels), dtype=np.float32)
+        self.late = types.SimpleNamespace(output_underflow=True)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        blocksize = self.blocksize
+        blocks = len(self.signal) // blocksize
+        deadline = time.perf_counter() + self.period
+        i = 0
+        while not self.stopped.is_set():
+            wait = deadline - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            status = self.late if time.perf_counter() > deadline + self.period else None
+            block = self.signal[(i % blocks) * blocksize:(i % blocks + 1) * blocksize]
+            self.callback(block, self.outdata, blocksize, None, status)
+            i += 1
+            deadline += self.period
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def close(self):
+        pass
+
+
+def simulated_arm(jammer):
+    """SpeechJammer.arm yerine: tamponları ayır ve saat sürücüsünü başlat"""
+    jammer.split_streams = False
+    jammer.allocate_buffers()
+    jammer.stream = ClockedStream(jammer.callback, jammer.sample_rate, jammer.blocksize, jammer.input_channels)
+    jammer.stream.start()
+    return True
+
+
+def ui_load(stopped, burst, pause):
+    """Arayüz thread'i: burst saniye saf Python işi (GIL tutulur), sonra pause saniye uyku"""
+    while not stopped.is_set():
+        end = time.perf_counter() + burst
+        text = []
+        while time.perf_counter() < end:
+            text.append(f"{len(text):>6} {sum(range(200))}")
+            if len(text) > 1000:
+                text.clear()
+        time.sleep(pause)
+
+
+def cpu_load(stopped):
+    """Bir çekirdeği meşgul eden süreç"""
+    while not stopped.is_set():
+        sum(range(10000))
+
+
+def run_mode(mode, args):
+    """Tek modu yük altında çalıştır, callback sayaçlarının özetini döndür"""
+    stopped = threading.Event()
+    threads = [threading.Thread(target=ui_load, args=(stopped, args.burst_ms / 1000, args.pause_ms / 1000), daemon=True)
+               for _ in range(args.ui_threads)]
+    context = multiprocessing.get_context('spawn')
+    cpu_stopped = context.Event()
+    hogs = [context.Process(target=cpu_load, args=(cpu_stopped,), daemon=True) for _ in range(args.cpu_load)]
+
+    engine = jammer = None
+    priority = ""
+    if mode == 'thread':
+        jammer = load_script(SCRIPT).SpeechJammer()
+        simulated_arm(jammer)
+        jammer.start()
+        source = counters = jammer.monitor
+    else:
+        realtime = mode == 'process-rt'
+        engine = EngineProcess(script=SCRIPT, realtime=realtime, priority=args.priority,
+                               lock=realtime, arm=simulated_arm)
+        if not engine.launch():
+            engine.close()
+            raise RuntimeError("motor süreci başlatılamadı")
+        engine.start()
+        source, counters = engine, engine.monitor
+
+    for process in hogs:
+        process.start()
+    for thread in threads:
+        thread.start()
+    try:
+        # Isınma: dağılım ve sayaçlar yük başladıktan sonraki farktan hesaplanır
+        time.sleep(0.5)
+        baseline = source.snapshot()
+        time.sleep(args.seconds)
+        snapshot = source.snapshot()
+        if engine is not None:
+            priority = priority_text(engine.state)
+    finally:
+        stopped.set()
+        cpu_stopped.set()
+        for thread in threads:
+            thread.join()
+        for process in hogs:
+            process.join()
+        if engine is not None:
+            engine.close()
+        else:
+            jammer.disarm()
+    jitter = [after - before for after, before in zip(snapshot['jitter_histogram'], baseline['jitter_histogram'])]
+    return {
+        'callbacks': snapshot['callbacks'] - baseline['callbacks'],
+        'late': snapshot['xrun_total'] - baseline['xrun_total'],
+        'jitter_p99': counters._percentile(jitter, 0.99),
+        'jitter_max': snapshot['jitter_max'] * counters.period * 10,  # ms
+        'load_max': snapshot['load_max'],
+        'priority': priority,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Yük altında callback jitter'ı, süreç yalıtımıyla ve yalıtımsız")
+    parser.add_argument('--seconds', type=float, default=5.0, help="mod başına ölçüm süresi")
+    parser.add_argument('--ui-threads', type=int, default=2, help="sentetik arayüz thread sayısı")
+    parser.add_argument('--burst-ms', type=float, default=10.0, help="arayüz thread'inin GIL'i tuttuğu süre")
+    parser.add_argument('--pause-ms', type=float, default=20.0, help="patlamalar arası uyku")
+    parser.add_argument('--cpu-load', type=int, default=0, help="çekirdek meşgul eden süreç sayısı")
+    parser.add_argument('--realtime', action='store_true', help="SCHED_FIFO + mlockall ile ayrı süreci de ölç")
+    parser.add_argument('--priority', type=int, default=70)
+    args = parser.parse_args(argv)
+
+    modes = ['thread', 'process'] + (['process-rt'] if args.realtime else [])
+    print(f"{os.cpu_count()} çekirdek, {args.ui_threads} arayüz thread'i ({args.burst_ms:.0f}/{args.pause_ms:.0f} ms), "
+          f"{args.cpu_load} CPU yükü süreci")
+    print(f"{'mod':<11} {'callback':>9} {'jitter p99%':>12} {'jitter max ms':>14} {'yük max%':>9} {'geç blok':>9}")
+    for mode in modes:
+        result = run_mode(mode, args)
+        print(f"{mode:<11} {result['callbacks']:>9} {result['jitter_p99']:>12.0f} {result['jitter_max']:>14.2f} "
+              f"{result['load_max']:>9.0f} {result['late']:>9}{result['priority']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
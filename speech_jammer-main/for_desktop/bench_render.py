@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""render.py için WAV biçim denetimi ve hız ölçümü
+
+Ses kartı ve soundfile olmadan çalışır. Her biçim için (8/16/24/32 bit
+PCM, 32 bit float) bilinen bir sinyal geçici bir WAV dosyasına yazılır,
+WavReader ile parça parça geri okunur ve örnek başına en büyük hata
+yarım basamağa (LSB) göre denetlenir. Sinyal -1.0, -0.5, 0.0 ve en büyük
+pozitif değerle başlar, 8 bitteki sıfır noktası taşması gibi hatalar
+ilk bloktan görünür. Ardından aynı dosya render_file ile işlenir ve
+gerçek zamanın kaç katı hızda işlendiği raporlanır. Bir biçim hatalı
+çözülürse çıkış kodu 1'dir.
+
+Kullanım:
+    python3 bench_render.py
+    python3 bench_render.py --seconds 30 --channels 1 --chunk 4096
+"""
+
+import argparse
+import os
+import struct
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from render import CHUNK, WavReader, render_file
+
+# ad -> (biçim etiketi, bit sayısı)
+FORMATS = {
+    'pcm8': (1, 8),
+    'pcm16': (1, 16),
+    'pcm24': (1, 24),
+    'pcm32': (1, 32),
+    'float32': (3, 32),
+}
+
+
+def encode(signal, tag, bits):
+    """[-1, 1) aralığındaki sinyali WAV örnek baytlarına ve çözülmesi gereken değere çevir"""
+    if tag == 3:
+        pcm = signal.astype('<f4')
+        return pcm.tobytes(), pcm.astype(np.float64)
+    full = 2.0 ** (bits - 1)
+    whole = np.clip(np.round(signal * full), -full, full - 1).astype(np.int64)
+    expected = whole / full
+    if bits == 8:
+        data = (whole + 128).astype('u1').tobytes()
+    elif bits == 24:
+        data = whole.astype('<i4').view('u1').reshape(whole.shape + (4,))[..., :3].tobytes()
+    else:
+        data = whole.astype(f'<i{bits // 8}').tobytes()
+    return data, expected
+
+
+def write_wav(path, data, tag, bits, sample_rate, channels):
+    block_align = channels * bits // 8
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<4sI4s', b'RIFF', 36 + len(data), b'WAVE'))
+        f.write(struct.pack('<4sIHHIIHH', b'fmt ', 16, tag, channels, sample_rate,
+                            sample_rate * block_align, block_align, bits))
+        f.write(struct.pack('<4sI', b'data', len(data)))
+        f.write(data)
+
+
+def round_trip(path, expected, chunk):
+    """Dosyayı WavReader ile oku, beklenen değerlerden en büyük farkı döndür"""
+    reader = WavReader(path)
+    try:
+        if reader.frames != len(expected):
+            return np.inf
+        error = 0.0
+        start = 0
+        for block in reader.chunks(chunk):
+            error = max(error, float(np.max(np.abs(block - expected[start:start + len(block)]))))
+            start += len(block)
+    finally:
+        reader.close()
+    return error
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="render.py WAV biçim denetimi ve hız ölçümü")
+    parser.add_argument('--formats', nargs='+', default=list(FORMATS), choices=list(FORMATS))
+    parser.add_argument('--seconds', type=float, default=10.0, help="test dosyasının süresi")
+    parser.add_argument('--rate', type=int, default=48000)
+    parser.add_argument('--channels', type=int, default=2)
+    parser.add_argument('--chunk', type=int, default=CHUNK, help="parça başına örnek")
+    parser.add_argument('--delay', type=float, default=0.18)
+    parser.add_argument('--faf', type=float, default=None, metavar='YARIM_TON')
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    frames = int(args.seconds * args.rate)
+    signal = rng.uniform(-1.0, 1.0, (frames, args.channels))
+    signal[:4] = np.array([-1.0, -0.5, 0.0, 127 / 128])[:, None]
+
+    failed = 0
+    print(f"{'biçim':<8} {'en büyük hata':>14} {'sınır':>10} {'x gerçek zaman':>15}  çözme")
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.formats:
+            tag, bits = FORMATS[name]
+            data, expected = encode(signal, tag, bits)
+            source = os.path.join(directory, f"{name}.wav")
+            write_wav(source, data, tag, bits, args.rate, args.channels)
+            # float32 sinyalin kendisidir, PCM'de float32'ye çevirme payı eklenir
+            limit = 1e-6 if tag == 3 else 0.5 / 2.0 ** (bits - 1) + 1e-6
+            error = round_trip(source, expected, args.chunk)
+            ok = error <= limit
+            failed += not ok
+            _, seconds, cpu, _ = render_file(source, os.path.join(directory, f"{name}_jammed.wav"),
+                                             args.delay, 0.8, args.faf, 1024, args.chunk)
+            print(f"{name:<8} {error:>14.2e} {limit:>10.2e} {seconds / max(cpu, 1e-9):>15.0f}  "
+                  f"{'OK' if ok else 'HATALI'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
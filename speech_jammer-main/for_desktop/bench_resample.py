@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""PolyphaseResampler ile doğrusal aradeğerleme (plug) karşılaştırması
+
+İşletim sistemi dönüşümü olmadan giriş ve çıkış hızları farklıysa
+ALSA plug eklentisi varsayılan olarak doğrusal aradeğerleme kullanır.
+Bu araç her hız çifti için iki yolu aynı bloklarla çalıştırır ve şunları
+raporlar:
+  - blok başına süre, blok süresinin yüzdesi olarak (p50/p99)
+  - 3 kHz tonda ideal sinyale göre hata (dB)
+  - hız düşürülürken yeni Nyquist'in üstündeki tonun katlanan kısmı (dB)
+
+Kullanım:
+    python3 bench_resample.py
+    python3 bench_resample.py --pairs 44100:48000 48000:16000 --blocksizes 256
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from resample import PolyphaseResampler
+
+PAIRS = ['44100:48000', '48000:44100', '48000:16000', '16000:48000', '44100:16000']
+BLOCKSIZES = [128, 256, 512]
+WARMUP_BLOCKS = 10
+
+
+class LinearResampler:
+    """plug eklentisinin varsayılanı gibi iki komşu örnek arasında doğrusal aradeğerleme"""
+    def __init__(self, in_rate, out_rate, channels=2, max_block=4096, dtype=np.float32):
+        self.step = in_rate / out_rate
+        self.max_output = int(np.ceil(max_block / self.step)) + 2
+        self.buffer = np.zeros((max_block + 1, channels), dtype=dtype)
+        self.output_index = np.arange(self.max_output, dtype=np.float64)
+        self.position = np.zeros(self.max_output)
+        self.whole = np.zeros(self.max_output, dtype=np.intp)
+        self.fraction = np.zeros((self.max_output, 1))
+        self.following = np.zeros((self.max_output, channels), dtype=dtype)
+        self.latency = 0.0
+        self.time = 1.0  # Sonraki çıkışın tampondaki konumu (0 = önceki bloğun son örneği)
+
+    def process(self, block, out):
+        frames = len(block)
+        self.buffer[1:frames + 1] = block
+        count = max(0, int(np.floor((frames - self.time) / self.step)) + 1)
+        position = self.position[:count]
+        np.multiply(self.output_index[:count], self.step, out=position)
+        position += self.time
+        # Tam kısım son örneğe kırpılır, kesir kırpılmış tam kısma göre
+        whole = self.whole[:count]
+        np.copyto(whole, position, casting='unsafe')
+        np.minimum(whole, frames - 1, out=whole)
+        np.subtract(position, whole, out=self.fraction[:count, 0])
+
+        chunk = out[:count]
+        following = self.following[:count]
+        np.take(self.buffer, whole, axis=0, out=chunk)
+        whole += 1
+        np.take(self.buffer, whole, axis=0, out=following)
+        np.subtract(following, chunk, out=following)
+        np.multiply(following, self.fraction[:count], out=following)
+        np.add(chunk, following, out=chunk)
+
+        self.time += count * self.step - frames
+        self.buffer[0] = self.buffer[frames]
+        return count
+
+
+def run(resampler, signal, blocksize):
+    """Sinyali bloklar halinde dönüştür, çıkışı ve blok sürelerini döndür"""
+    channels = signal.shape[1]
+    out = np.zeros((resampler.max_output, channels), dtype=np.float32)
+    output = []
+    durations = []
+    for start in range(0, len(signal) - blocksize + 1, blocksize):
+        begin = time.perf_counter()
+        count = resampler.process(signal[start:start + blocksize], out)
+        durations.append(time.perf_counter() - begin)
+        output.append(out[:count].copy())
+    return np.concatenate(output), np.array(durations[WARMUP_BLOCKS:])
+
+
+def tone(frequency, rate, seconds, channels):
+    t = np.arange(int(rate * seconds)) / rate
+    return np.repeat(np.sin(2 * np.pi * frequency * t)[:, np.newaxis], channels, axis=1).astype(np.float32)
+
+
+def error_db(output, frequency, rate, latency):
+    """Çıkışın ideal gecikmeli tona göre en büyük hatası (dB)"""
+    n = np.arange(len(output))
+    ideal = np.sin(2 * np.pi * frequency * (n - latency) / rate)
+    skip = int(latency) + rate // 100
+    error = np.max(np.abs(output[skip:-8, 0] - ideal[skip:-8]))
+    return 20 * np.log10(max(error, 1e-12))
+
+
+def level_db(output, rate):
+    skip = rate // 20
+    rms = np.sqrt(np.mean(output[skip:, 0].astype(np.float64) ** 2))
+    return 20 * np.log10(max(rms * np.sqrt(2), 1e-12))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Polifaz ve doğrusal örnekleme hızı dönüşümü karşılaştırması")
+    parser.add_argument('--pairs', nargs='+', default=PAIRS, help="giriş:çıkış hızları")
+    parser.add_argument('--blocksizes', nargs='+', type=int, default=BLOCKSIZES)
+    parser.add_argument('--channels', type=int, default=2)
+    parser.add_argument('--taps', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    print(f"{'giriş':>6} {'çıkış':>6} {'blok':>5} {'yol':<8} {'p50%':>7} {'p99%':>7} {'hata dB':>8} {'katlanma dB':>12}")
+    for pair in args.pairs:
+        in_rate, out_rate = (int(rate) for rate in pair.split(':'))
+        signal = tone(3000, in_rate, args.seconds, args.channels)
+        # Sadece hız düşürülürken: çıkış Nyquist'inin üstünde, giriş Nyquist'inin altında bir ton
+        alias_frequency = min(0.6 * out_rate, (in_rate + out_rate) / 4) if out_rate < in_rate else None
+        for blocksize in args.blocksizes:
+            period = blocksize / in_rate
+            paths = {
+                'polifaz': lambda: PolyphaseResampler(in_rate, out_rate, args.channels, blocksize, taps=args.taps),
+                'doğrusal': lambda: LinearResampler(in_rate, out_rate, args.channels, blocksize),
+            }
+            for name, make in paths.items():
+                resampler = make()
+                output, durations = run(resampler, signal, blocksize)
+                percent = durations / period * 100
+                error = error_db(output, 3000, out_rate, resampler.latency)
+                alias = "-"
+                if alias_frequency is not None:
+                    aliased, _ = run(make(), tone(alias_frequency, in_rate, args.seconds, args.channels), blocksize)
+                    alias = f"{level_db(aliased, out_rate):.1f}"
+                print(f"{in_rate:>6} {out_rate:>6} {blocksize:>5} {name:<8} "
+                      f"{np.percentile(percent, 50):>7.2f} {np.percentile(percent, 99):>7.2f} "
+                      f"{error:>8.1f} {alias:>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
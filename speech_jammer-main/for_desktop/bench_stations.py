@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Çok istasyonlu çalışmada istasyon sayısına göre CPU ölçeklenmesi
+
+Ses kartı olmadan çalışır: 1'den --max-stations'a kadar her adımda o
+kadar Station oluşturulur ve her biri PortAudio'daki gibi kendi
+thread'inde, blok süresi aralıklarla sentetik gürültüyle çağrılır.
+Her adım için şunlar raporlanır:
+  - sürecin toplam CPU kullanımı ve istasyon başına payı (bir çekirdeğin %'si)
+  - en kötü istasyonun callback süresi p99 (blok süresinin %'si)
+  - en kötü istasyonun başlama gecikmesi (jitter) p99, GIL beklemesi buraya yansır
+  - zamanında bitmeyen (gerçek akışta xrun olacak) blok sayısı
+
+Kullanım:
+    python3 bench_stations.py
+    python3 bench_stations.py --max-stations 8 --blocksize 128 --seconds 5
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from bench_callback import stub_missing
+
+stub_missing('sounddevice')
+stub_missing('keyboard')
+from stations import Station, MAX_STATIONS
+
+
+def drive(station, signal, seconds, late, index):
+    """Bir istasyonu gerçek zaman aralıklarıyla çağır, geç kalan blokları say"""
+    blocksize = station.blocksize
+    period = blocksize / station.sample_rate
+    outdata = np.zeros((blocksize, station.channels), dtype=np.float32)
+    blocks = len(signal) // blocksize
+    deadline = time.perf_counter() + period
+    end = deadline + seconds
+    i = 0
+    while deadline < end:
+        block = signal[(i % blocks) * blocksize:(i % blocks + 1) * blocksize]
+        station.callback(block, outdata, blocksize, None, None)
+        if time.perf_counter() > deadline + period:
+            late[index] += 1
+        i += 1
+        wait = deadline - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+        deadline += period
+
+
+def run_step(count, args, rng):
+    stations = []
+    for number in range(count):
+        station = Station(f"Kabin {number + 1}", sample_rate=args.rate, blocksize=args.blocksize,
+                          voice_gate=args.voice_gate)
+        station.allocate_buffers(1)
+        station.set_running(True)
+        stations.append(station)
+    # Sürekli konuşma: ses algılama açık olsa da etkin yol çalışır
+    signal = rng.uniform(-0.5, 0.5, (args.rate, 1)).astype(np.float32)
+    late = [0] * count
+    threads = [threading.Thread(target=drive, args=(station, signal, args.seconds, late, index))
+               for index, station in enumerate(stations)]
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    usage = (time.process_time() - cpu) / (time.perf_counter() - wall) * 100
+    snapshots = [station.monitor.snapshot() for station in stations]
+    return {
+        'cpu': usage,
+        'per_station': usage / count,
+        'load_p99': max(snapshot['load_p99'] for snapshot in snapshots),
+        'jitter_p99': max(snapshot['jitter_p99'] for snapshot in snapshots),
+        'late': sum(late),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="İstasyon sayısına göre CPU ölçeklenmesi")
+    parser.add_argument('--max-stations', type=int, default=MAX_STATIONS)
+    parser.add_argument('--rate', type=int, default=48000)
+    parser.add_argument('--blocksize', type=int, default=256)
+    parser.add_argument('--seconds', type=float, default=3.0, help="adım başına süre")
+    parser.add_argument('--voice-gate', action='store_true', help="sessizlikte ucuz yolu aç")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{os.cpu_count()} çekirdek, {args.rate} Hz, blok {args.blocksize}")
+    print(f"{'istasyon':>8} {'CPU%':>7} {'CPU%/ist':>9} {'yük p99%':>9} {'jitter p99%':>12} {'geç blok':>9}")
+    for count in range(1, args.max_stations + 1):
+        result = run_step(count, args, rng)
+        print(f"{count:>8} {result['cpu']:>7.1f} {result['per_station']:>9.2f} "
+              f"{result['load_p99']:>9.0f} {result['jitter_p99']:>12.0f} {result['late']:>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
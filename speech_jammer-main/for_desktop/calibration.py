@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import threading
+import numpy as np
+
+def make_chirp(sample_rate, seconds=0.3, low=300.0, high=6000.0, level=0.5):
+    """Üstel frekans taraması, kenarları yumuşatılmış
+
+    6 kHz'in üstüne çıkılmaz, 16 kHz Bluetooth (HFP) kulaklıklar da
+    taramanın tamamını iletir.
+    """
+    high = min(high, 0.45 * sample_rate)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    rate = np.log(high / low)
+    phase = 2 * np.pi * low * seconds / rate * (np.exp(t / seconds * rate) - 1)
+    chirp = level * np.sin(phase)
+    fade = min(len(chirp) // 10, int(0.005 * sample_rate))
+    if fade:
+        ramp = 0.5 - 0.5 * np.cos(np.pi * np.arange(fade) / fade)
+        chirp[:fade] *= ramp
+        chirp[-fade:] *= ramp[::-1]
+    return chirp
+
+
+def find_latency(segments, reference):
+    """Her kayıt parçasında referansın başladığı örneği çapraz ilişkiyle bul
+
+    segments (parça, örnek) şeklindedir; tüm parçalar tek rfft çağrısında
+    işlenir. Gecikmeler ve tepe/ortanca oranları (güven) döndürülür.
+    """
+    segments = np.atleast_2d(segments)
+    length = segments.shape[1]
+    size = 1 << int(np.ceil(np.log2(length + len(reference))))
+    spectrum = np.fft.rfft(segments, size, axis=1)
+    spectrum *= np.conj(np.fft.rfft(reference, size))
+    correlation = np.abs(np.fft.irfft(spectrum, size, axis=1)[:, :length - len(reference) + 1])
+    lags = np.argmax(correlation, axis=1)
+    peaks = correlation[np.arange(len(lags)), lags]
+    floor = np.median(correlation, axis=1) + 1e-12
+    return lags, peaks / floor
+
+
+class LatencyCalibrator:
+    """Çıkışa chirp çalıp girişten geri kaydederek gidiş-dönüş gecikmesini ölç
+
+    process() ses callback'inde normal işlemenin yerine çağrılır: çıkışa
+    sinyali yazar, girişi önceden ayrılmış kayda ekler. Ölçülen gecikme
+    gecikme hattı dışındaki her şeyi içerir: cihaz tamponları, Bluetooth
+    aktarımı, akustik yol ve ayrı akış bağlantısı.
+    """
+    def __init__(self, sample_rate, repeats=3, max_latency=1.0, min_confidence=8.0, spread=0.002):
+        self.sample_rate = sample_rate
+        self.chirp = make_chirp(sample_rate)
+        self.repeats = repeats
+        self.min_confidence = min_confidence
+        self.spread = int(spread * sample_rate)
+        self.segment = len(self.chirp) + int(max_latency * sample_rate)
+        self.signal = np.zeros(repeats * self.segment, dtype=np.float32)
+        for i in range(repeats):
+            self.signal[i * self.segment:i * self.segment + len(self.chirp)] = self.chirp
+        self.recording = np.zeros(len(self.signal), dtype=np.float32)
+        self.position = 0
+        self.done = threading.Event()
+
+    def process(self, input_audio, outdata):
+        """Ses thread'i: çıkışa sinyali yaz, girişin ilk kanalını kaydet"""
+        frames = len(outdata)
+        count = max(0, min(frames, len(self.signal) - self.position))
+        end = self.position + count
+        self.recording[self.position:end] = input_audio[:count, 0]
+        outdata[:count] = self.signal[self.position:end, np.newaxis]
+        outdata[count:] = 0
+        self.position = end
+        if end >= len(self.signal):
+            self.done.set()
+
+    def result(self):
+        """Gidiş-dönüş gecikmesi (örnek), ölçüm güvenilir değilse None"""
+        segments = self.recording.reshape(self.repeats, self.segment)
+        lags, confidence = find_latency(segments, self.chirp)
+        valid = lags[confidence >= self.min_confidence]
+        if len(valid) < (self.repeats + 1) // 2 or np.ptp(valid) > self.spread:
+            return None
+        return int(np.median(valid))
+
+    def run(self, attach, timeout=None):
+        """attach(self) ile callback'e bağlan, bitince ayrıl ve sonucu döndür"""
+        if timeout is None:
+            timeout = 2 * len(self.signal) / self.sample_rate + 1
+        attach(self)
+        try:
+            finished = self.done.wait(timeout)
+        finally:
+            attach(None)
+        return self.result() if finished else None
+
+
+class LatencyStore:
+    """Cihaz çifti başına ölçülen gecikmeleri (saniye) JSON dosyasında sakla"""
+    def __init__(self, path=None):
+        self.path = path or os.path.join(os.path.expanduser('~'), '.speech_jammer_latency.json')
+
+    @staticmethod
+    def key(input_name, output_name, sample_rate):
+        return f"{input_name} -> {output_name} @ {int(sample_rate)}"
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, key):
+        return self.load().get(key)
+
+    def set(self, key, seconds):
+        data = self.load()
+        data[key] = seconds
+        with open(self.path, 'w') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+# Tüm betiklerin paylaştığı kayıt
+latency_store = LatencyStore()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+import queue
+import keyboard  # pip install keyboard
+
+class KeyControls:
+    """Klavye kancalarından gelen tuşları komut kuyruğuna çevir
+
+    bindings: tuş adı -> (eylem adı, basılı tutunca tekrar etsin mi).
+    Tekrar etmeyen tuşlar bırakılana kadar bir kez sayılır, tekrar eden
+    tuşlar en fazla repeat_interval saniyede bir komut üretir. Ana thread
+    get() ile bekler, tuş basılmadıkça CPU kullanılmaz. Bekleme
+    poll_interval saniyelik parçalara bölünür, böylece Windows'ta da Ctrl+C
+    (KeyboardInterrupt) bekleme sırasında ulaşır.
+    """
+    def __init__(self, bindings, repeat_interval=0.1, poll_interval=0.5):
+        self.bindings = bindings
+        self.repeat_interval = repeat_interval
+        self.poll_interval = poll_interval
+        self.commands = queue.Queue()
+        self.held = {}  # Basılı tuş -> son komut zamanı
+        self.hook = None
+
+    def on_event(self, event):
+        """keyboard dinleyici thread'inde çalışır, sadece kuyruğa yazar"""
+        name = (event.name or '').lower()
+        binding = self.bindings.get(name)
+        if binding is None:
+            return
+        action, repeat = binding
+        if event.event_type == keyboard.KEY_UP:
+            self.held.pop(name, None)
+            return
+        last = self.held.get(name)
+        if last is not None and (not repeat or event.time - last < self.repeat_interval):
+            return
+        self.held[name] = event.time
+        self.commands.put(action)
+
+    def start(self):
+        self.hook = keyboard.hook(self.on_event)
+
+    def stop(self):
+        if self.hook is not None:
+            keyboard.unhook(self.hook)
+            self.hook = None
+
+    def post(self, action):
+        """Tuş dışından komut ekle (ör. hotplug thread'i)"""
+        self.commands.put(action)
+
+    def get(self):
+        """Sıradaki komutu bekle"""
+        while True:
+            try:
+                return self.commands.get(timeout=self.poll_interval)
+            except queue.Empty:
+                pass  # Zaman aşımı sadece Ctrl+C'nin işlenmesi için
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+import random
+import numpy as np
+
+class DelayLine:
+    """Blok tabanlı halka tampon gecikme hattı
+
+    Tampon en büyük gecikme (max_length) ve en büyük blok (max_block) için
+    bir kez ayrılır. Okuma kafası gecikme kadar geride durur ve akış
+    kapatılmadan set_length() ile taşınabilir.
+    """
+    def __init__(self, length, channels=2, dtype=np.float64, max_length=None, max_block=4096, fade_length=0):
+        self.max_length = max(length, max_length or 0)
+        self.max_block = max_block
+        self.size = self.max_length + max_block
+        self.channels = channels
+        self.buffer = np.zeros((self.size, channels), dtype=dtype)
+        self.position = 0
+        self.length = length  # Gecikme süresi (örnek sayısı)
+        self.target_length = length
+        # Gecikme değişiminde kullanılan çapraz geçiş rampası
+        self.fade_length = fade_length
+        self.fade_ramp = np.linspace(0, 1, fade_length + 2, dtype=dtype)[1:-1, np.newaxis]
+        self.fade_buffer = np.zeros((max_block, channels), dtype=dtype)
+        self.fade_position = fade_length
+        self.old_length = length
+        # Kesirli okuma için blok başına kullanılan hazır diziler
+        self.sample_index = np.arange(max_block, dtype=np.float64)
+        self.read_position = np.zeros(max_block)
+        self.read_whole = np.zeros(max_block)
+        self.read_fraction = np.zeros((max_block, 1), dtype=dtype)  # Tamponun tipinde, çarpım dönüşümsüz
+        self.read_index = np.zeros(max_block, dtype=np.intp)
+
+    def set_length(self, length):
+        """Yeni gecikmeyi ayarla, callback bir sonraki blokta geçişe başlar"""
+        self.target_length = min(max(int(length), 0), self.max_length)
+
+    def _write(self, block):
+        """block'u yazma konumundan itibaren en fazla iki dilimde yaz"""
+        count = len(block)
+        first = min(count, self.size - self.position)
+        self.buffer[self.position:self.position + first] = block[:first]
+        self.buffer[:count - first] = block[first:]
+
+    def _read(self, delay, out):
+        """Yazılan bloğun delay örnek gerisini en fazla iki dilimde oku"""
+        count = len(out)
+        start = (self.position - delay) % self.size
+        first = min(count, self.size - start)
+        out[:first] = self.buffer[start:start + first]
+        out[first:] = self.buffer[:count - first]
+
+    def process(self, block, out):
+        """block'u tampona yaz, length örnek önceki sesi out'a oku
+
+        Okuma ve yazma aralıkları tamponun sonunda en fazla iki dilime
+        bölünür. out ile block aynı dizi olmamalı.
+        """
+        frames = len(block)
+        start = 0
+        while start < frames:
+            end = min(frames, start + self.max_block)
+            chunk = out[start:end]
+            self._write(block[start:end])
+
+            # Geçiş bitmişse bekleyen yeni gecikmeye geç
+            if self.fade_position >= self.fade_length and self.target_length != self.length:
+                self.old_length = self.length
+                self.length = self.target_length
+                self.fade_position = 0
+            self._read(self.length, chunk)
+
+            if self.fade_position < self.fade_length:
+                # Eski ve yeni okuma kafası arasında doğrusal çapraz geçiş
+                count = min(end - start, self.fade_length - self.fade_position)
+                old = self.fade_buffer[:count]
+                new = chunk[:count]
+                self._read(self.old_length, old)
+                ramp = self.fade_ramp[self.fade_position:self.fade_position + count]
+                np.subtract(new, old, out=new)
+                np.multiply(new, ramp, out=new)
+                np.add(new, old, out=new)
+                self.fade_position += count
+
+            self.position = (self.position + end - start) % self.size
+            start = end
+
+    def write(self, block):
+        """block'u sadece tampona yaz, okuma yapılmaz (sessiz blok yolu)
+
+        Çıkış kullanılmadığı için bekleyen gecikme değişimi geçişsiz
+        tamamlanır.
+        """
+        frames = len(block)
+        start = 0
+        while start < frames:
+            end = min(frames, start + self.max_block)
+            self._write(block[start:end])
+            self.position = (self.position + end - start) % self.size
+            start = end
+        self.length = self.old_length = self.target_length
+        self.fade_position = self.fade_length
+
+    def process_fractional(self, block, out, delays):
+        """block'u tampona yaz, her örneği delays kadar geriden aradeğerleyerek oku
+
+        delays örnek cinsinden kesirli gecikme eğrisidir (her çıkış örneği
+        için bir değer). İki komşu örnek arasında doğrusal aradeğerleme
+        yapılır, tüm blok numpy ile tek seferde hesaplanır.
+        """
+        frames = len(block)
+        start = 0
+        while start < frames:
+            end = min(frames, start + self.max_block)
+            count = end - start
+            chunk = out[start:end]
+            self._write(block[start:end])
+
+            # Okuma konumu = yazma konumu + örnek sırası - gecikme
+            position = self.read_position[:count]
+            np.subtract(self.sample_index[:count], delays[start:end], out=position)
+            position += self.position
+            whole = self.read_whole[:count]
+            np.floor(position, out=whole)
+            # Kesir float64'te hesaplanıp tampon tipine kopyalanır, ufunc dönüşüm tamponu ayırmaz
+            np.subtract(position, whole, out=position)
+            fraction = self.read_fraction[:count]
+            np.copyto(fraction[:, 0], position, casting='same_kind')
+            index = self.read_index[:count]
+            np.copyto(index, whole, casting='unsafe')
+
+            # chunk = x[n] + (x[n + 1] - x[n]) * kesir
+            following = self.fade_buffer[:count]
+            np.take(self.buffer, index, axis=0, out=chunk, mode='wrap')
+            index += 1
+            np.take(self.buffer, index, axis=0, out=following, mode='wrap')
+            np.subtract(following, chunk, out=following)
+            np.multiply(following, fraction, out=following)
+            np.add(chunk, following, out=chunk)
+
+            self.position = (self.position + count) % self.size
+            start = end
+
+        # Sabit gecikmeye dönüldüğünde geçiş son okunan konumdan başlar
+        self.length = self.old_length = min(int(round(delays[frames - 1])), self.max_length)
+        self.fade_position = self.fade_length
+
+
+class DelayModulator:
+    """Gecikmeyi bir bant içinde sabit hızla ve rastgele gezdir
+
+    Değerler örnek cinsindendir. rate, her örnekte gecikmenin ne kadar
+    değiştiğidir (0.01 = saniyede 10 ms). Eğri blok başına bir kez üretilir.
+    """
+    def __init__(self, start, low, high, rate, max_block=4096, seed=None):
+        self.low = low
+        self.high = high
+        self.rate = rate
+        self.current = float(start)
+        self.random = random.Random(seed)
+        self.target = self.random.uniform(low, high)
+        self.ramp = np.arange(1, max_block + 1, dtype=np.float64)
+        self.curve = np.zeros(max_block)
+
+    def next_block(self, frames):
+        """Sonraki blok için örnek başına gecikme eğrisini döndür"""
+        curve = self.curve[:frames]
+        step = self.rate if self.target >= self.current else -self.rate
+        np.multiply(self.ramp[:frames], step, out=curve)
+        curve += self.current
+        # Hedefe ulaşınca orada dur, yeni hedefi bir sonraki blok kullanır
+        if step > 0:
+            np.minimum(curve, self.target, out=curve)
+        else:
+            np.maximum(curve, self.target, out=curve)
+        self.current = float(curve[frames - 1])
+        if self.current == self.target:
+            self.target = self.random.uniform(self.low, self.high)
+        return curve
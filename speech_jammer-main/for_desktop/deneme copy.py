@@ -2,107 +2,501 @@
 
 import sounddevice as sd
 import numpy as np
-import threading
 import time
-import keyboard  # pip install keyboard
-import random
 import sys
+from delay_line import DelayLine, DelayModulator
+from dsp_chain import output_chain, profile_text
+from params import ParamStore
+from pitch_shift import PitchShifter
+from voice_activity import VoiceActivityDetector
+from routing import input_channel_count, routing_matrix
+from stream_link import StreamLink
+from calibration import LatencyCalibrator, latency_store
+from recorder import SessionRecorder
+from controls import KeyControls
+from device_registry import registry, watch_hotplug
+from instrumentation import CallbackMonitor, MonitorReporter, health_text
+
+# Tuş -> (eylem, basılı tutunca tekrar etsin mi)
+KEY_BINDINGS = {
+    'space': ('toggle', False),
+    'up': ('delay_up', True),
+    'down': ('delay_down', True),
+    'right': ('gain_up', True),
+    'left': ('gain_down', True),
+    'm': ('modulate', False),
+    'f': ('faf', False),
+    'v': ('voice_gate', False),
+    'c': ('calibrate', False),
+    'k': ('record', False),
+    'p': ('profile', False),
+    'd': ('dry', False),
+    'f5': ('rescan', False),
+    'esc': ('quit', False),
+    'q': ('quit', False),
+}
 
 class SpeechJammer:
-    def __init__(self, delay=0.18, feedback_gain=0.8, output_device=None):
+    def __init__(self, delay=0.18, feedback_gain=0.8, output_device=None, routes=None):
         self.delay = delay  # Gecikme süresi (saniye)
         self.feedback_gain = feedback_gain  # Geri besleme şiddeti
-        self.output_device = output_device
+        self.output_device = None
+        self.output_name = None  # Yenilemeden sonra indeks değişebilir, cihaz adıyla bulunur
+        self.select_output(output_device)
+        self.routes = routes  # Kullanıcı tanımlı kanal yönlendirmesi, örn. [(2, 0)]
         self.sample_rate = 44100
-        self.buffer_size = int(self.delay * self.sample_rate)
-        self.audio_buffer = np.zeros((self.buffer_size, 2))
-        self.write_position = 0
+        self.blocksize = 256
+        self.channels = 2
+        self.input_channels = 2
+        self.dtype = 'float32'
+        self.max_delay = 0.5  # Gecikme hattının boyutu (saniye)
+        self.fade_time = 0.005  # Gecikme değişiminde çapraz geçiş süresi
+        self.modulation_band = (0.18, 0.22)  # Sürekli rastgele gecikme bandı (saniye)
+        self.modulation_rate = 0.01  # Saniyede 10 ms gecikme değişimi
+        self.modulate = False
+        self.modulator = None
+        self.faf_semitones = 3  # FAF frekans kaydırma (yarım ton)
+        self.fft_size = 1024
+        self.faf = False
+        self.pitch_shifter = None
+        self.voice_gate = True  # Sessizlikte ucuz yola geç
+        self.voice_hangover = 0.3  # Son konuşmadan sonra etkin kalma süresi (saniye)
+        self.voice = None
+        self.limit = True  # Şiddet 1'e yakınken kırpılmayı önleyen sınırlayıcı
+        self.profile_stages = False
+        self.dry_mix = 0.0  # Gecikmesiz mikrofonun kulaklığa karışım oranı
+        self.dry_levels = (0.0, 0.25, 0.5)  # D tuşunun dolaştığı oranlar
+        self.output_chain = None
+        self.params = ParamStore()  # Ses thread'inin okuduğu değişmez ayar görüntüsü
+        self.applied_params = None
+        self.delay_line = None
+        self.monitor = CallbackMonitor(self.sample_rate, self.blocksize)
         self.stream = None
+        self.split_streams = True  # Giriş ve çıkış ayrı akışlarda, her biri kendi saatinde
+        self.input_stream = None
+        self.link = None
+        self.round_trip = None  # Ölçülen gidiş-dönüş gecikmesi (örnek)
+        self.latency_key = None
+        self.calibration = None
+        self.recorder = None  # Açıkken mikrofon ve çıkış dosyaya yazılır
         self.running = False
         self.led_status = False
         
+    def allocate_buffers(self):
+        """Callback'in kullandığı tüm tamponları akışın tipinde bir kez ayır"""
+        # Çıkış aşamaları önce kurulur, gecikmeleri gecikme hattından düşülür
+        self.dry_audio = np.zeros((self.blocksize, self.channels), dtype=self.dtype)
+        self.output_chain = output_chain(
+            self.sample_rate, limit=self.limit, dry_source=self.dry_audio
+        ).build(self.blocksize, self.channels, self.dtype)
+        self.output_chain.profile(self.profile_stages)
+        self.delay_line = DelayLine(
+            self.delay_frames(self.delay), self.channels, dtype=self.dtype,
+            max_length=int(self.max_delay * self.sample_rate),
+            max_block=self.blocksize,
+            fade_length=int(self.fade_time * self.sample_rate)
+        )
+        self.input_audio = np.zeros((self.blocksize, self.channels), dtype=self.dtype)
+        self.capture_audio = np.zeros((self.blocksize, self.channels), dtype=self.dtype)
+        self.routing = routing_matrix(self.input_channels, self.channels, self.routes, self.dtype)
+        self.set_modulation(self.modulate)
+        self.set_faf(self.faf)
+        self.set_voice_gate(self.voice_gate)
+        self.applied_params = None
+        self.publish()
+        self.monitor.reset(self.sample_rate, self.blocksize)
+        
     def callback(self, indata, outdata, frames, time, status):
-        if status:
-            print(status)
-        
-        # Kanal uyumluluğunu sağla
-        if indata.shape[1] == 4 and outdata.shape[1] == 2:
-            # 4 kanaldan 2 kanala dönüştür
-            input_audio = np.mean(indata, axis=1, keepdims=True)
-            input_audio = np.repeat(input_audio, 2, axis=1)
+        # Ses thread'inde print yok, durum bayrakları sayaçlara yazılır
+        start = self.monitor.begin(status)
+        
+        # Callback içinde yeni dizi oluşturulmaz, sadece hazır tamponlar kullanılır
+        input_audio = self.input_audio[:frames]
+        
+        # Kanalları akış açılırken hesaplanan matrisle tek adımda yönlendir
+        np.dot(indata, self.routing, out=input_audio)
+        self.process_recorded(input_audio, outdata, frames)
+        self.monitor.end(start)
+        
+    def input_callback(self, indata, frames, time, status):
+        """Ayrı giriş akışı: yönlendirip halkaya yaz, işleme çıkış tarafında yapılır"""
+        self.monitor.flags(status)
+        capture_audio = self.capture_audio[:frames]
+        np.dot(indata, self.routing, out=capture_audio)
+        self.link.write(capture_audio)
+        
+    def output_callback(self, outdata, frames, time, status):
+        """Ayrı çıkış akışı: halkadan saat kayması düzeltilerek oku ve işle"""
+        start = self.monitor.begin(status)
+        input_audio = self.input_audio[:frames]
+        self.link.read(input_audio)
+        self.process_recorded(input_audio, outdata, frames)
+        self.monitor.end(start)
+        
+    def process_recorded(self, input_audio, outdata, frames):
+        """Kayıt açıksa işlenmemiş girişi ve son çıkışı kaydediciye kopyala"""
+        recorder = self.recorder
+        if recorder is None:
+            self.process(input_audio, outdata, frames)
+            return
+        # FAF girişi yerinde değiştirdiği için mikrofon işlemeden önce alınır
+        recorder.record_input(input_audio)
+        self.process(input_audio, outdata, frames)
+        recorder.record_output(outdata)
+        
+    def process(self, input_audio, outdata, frames):
+        """Yönlendirilmiş girişi işle: ses algılama, FAF, gecikme ve şiddet"""
+        # Kalibrasyon sırasında çıkışta ölçüm sinyali çalar
+        calibration = self.calibration
+        if calibration is not None:
+            calibration.process(input_audio, outdata)
+            return
+        
+        # Blok boyunca tek bir ayar görüntüsü kullanılır, UI ortada değiştiremez
+        params = self.params.current
+        if params is not self.applied_params:
+            self.delay_line.set_length(params.delay_frames)
+            self.applied_params = params
+        
+        # Durdurulmuşken şiddet 0'a inip oturunca ıslak yol (ses algılama, FAF,
+        # gecikmeli okuma, zincir) atlanır, gecikme hattı dolmaya devam eder
+        if self.output_chain.muted(params):
+            self.delay_line.write(input_audio)
+            outdata.fill(0)
+            return
+        
+        # Karışım aşaması için gecikmesiz mikrofon, FAF girişi değiştirmeden önce alınır
+        np.copyto(self.dry_audio[:frames], input_audio)
+        
+        # Sessizlikte ucuz yol: sadece gecikme hattına yaz, kazanç/FAF atlanır
+        voice = self.voice
+        if voice is not None and not voice.update(input_audio):
+            self.delay_line.write(input_audio)
+            outdata.fill(0)
+            return
+        
+        # İsteğe bağlı FAF: frekansı kaydırılan ses gecikme hattına yazılır
+        pitch_shifter = self.pitch_shifter
+        if pitch_shifter is not None:
+            pitch_shifter.process(input_audio, input_audio)
+        
+        # Gecikmeli sesi doğrudan çıkışa yaz
+        modulator = self.modulator
+        if modulator is not None:
+            # Gecikme blok içinde örnek örnek kayar, okuma kesirli yapılır
+            delays = modulator.next_block(frames)
+            self.delay_line.process_fractional(input_audio, outdata, delays)
         else:
-            min_channels = min(indata.shape[1], outdata.shape[1])
-            input_audio = np.zeros((frames, outdata.shape[1]))
-            input_audio[:, :min_channels] = indata[:, :min_channels]
+            self.delay_line.process(input_audio, outdata)
         
-        # Gecikmeli sesi hesapla
-        delayed_audio = np.zeros((frames, 2))
-        for i in range(frames):
-            read_pos = (self.write_position - self.buffer_size) % self.buffer_size
-            delayed_audio[i] = self.audio_buffer[read_pos]
-            self.audio_buffer[self.write_position] = input_audio[i]
-            self.write_position = (self.write_position + 1) % self.buffer_size
+        # Şiddet ve sınırlayıcı: akış açılırken kurulan aşama zinciri
+        self.output_chain.run(outdata, params)
         
-        # Gecikmeli sesi çıkışa ver + geri besleme
-        outdata[:] = delayed_audio * self.feedback_gain
+    def set_delay(self, delay):
+        """Akışı kapatmadan gecikmeyi değiştir, okuma kafası yumuşak geçişle taşınır"""
+        self.delay = min(self.max_delay, max(0.0, delay))
+        if self.delay_line is not None:
+            self.publish()
+            self.update_voice_hangover()
         
-    def start(self):
-        if not self.running:
+    def set_gain(self, gain):
+        """Geri besleme şiddetini değiştir, ses thread'i bir blokta rampalar"""
+        self.feedback_gain = gain
+        self.publish()
+        
+    def publish(self):
+        """UI tarafındaki ayarları tek bir değişmez görüntü olarak ses thread'ine ver"""
+        self.params.publish(
+            gain=self.feedback_gain if self.running else 0.0,
+            dry=self.dry_mix if self.running else 0.0,
+            delay_frames=self.delay_frames(self.delay)
+        )
+        
+    def delay_frames(self, delay):
+        """Gecikme hattının uzunluğu: ölçülen cihaz gecikmesi ya da bağlantının gecikmesi düşülür"""
+        frames = int(delay * self.sample_rate)
+        if self.round_trip is not None:
+            # Ölçülen gidiş-dönüş, ayrı akış bağlantısını da içerir
+            frames -= self.round_trip
+        elif self.link is not None:
+            frames -= int(round(self.link.latency))
+        if self.output_chain is not None:
+            frames -= self.output_chain.latency
+        return max(0, frames)
+        
+    def set_modulation(self, enabled):
+        """Gecikmeyi bant içinde sürekli gezdiren modu aç/kapat"""
+        self.modulate = enabled
+        if enabled and self.delay_line is not None:
+            low, high = self.modulation_band
+            self.modulator = DelayModulator(
+                self.delay_line.length,
+                self.delay_frames(low),
+                self.delay_frames(high),
+                self.modulation_rate,
+                max_block=self.blocksize
+            )
+        else:
+            self.modulator = None
+        self.update_voice_hangover()
+        
+    def set_faf(self, enabled, semitones=None):
+        """Frekansı değiştirilmiş geri beslemeyi (FAF) aç/kapat, gecikmeyle birlikte çalışır"""
+        self.faf = enabled
+        if semitones is not None:
+            self.faf_semitones = semitones
+        if enabled and self.delay_line is not None:
+            self.pitch_shifter = PitchShifter(
+                self.faf_semitones,
+                self.fft_size,
+                channels=self.input_audio.shape[1],
+                dtype=self.dtype
+            )
+        else:
+            self.pitch_shifter = None
+        self.update_voice_hangover()
+        
+    def set_voice_gate(self, enabled):
+        """Konuşma yokken gecikme hattına yazıp sessiz çıkan ucuz yolu aç/kapat"""
+        self.voice_gate = enabled
+        if enabled and self.delay_line is not None:
+            self.voice = VoiceActivityDetector(self.blocksize, 0)
+        else:
+            self.voice = None
+        self.update_voice_hangover()
+        
+    def set_dry(self, dry):
+        """Gecikmesiz mikrofonun karışım oranını değiştir, ses thread'i bir blokta rampalar"""
+        self.dry_mix = dry
+        self.publish()
+        
+    def set_profiling(self, enabled):
+        """Çıkış zincirinde aşama başına süre ölçümünü aç/kapat"""
+        self.profile_stages = enabled
+        if self.output_chain is not None:
+            self.output_chain.profile(enabled)
+        
+    def update_voice_hangover(self):
+        """Konuşma bittikten sonra gecikmeli sesin tamamı çalınana kadar etkin kal"""
+        voice = self.voice
+        if voice is None:
+            return
+        delay = self.modulation_band[1] if self.modulator is not None else self.delay
+        hangover = int((delay + self.voice_hangover) * self.sample_rate)
+        if self.pitch_shifter is not None:
+            hangover += self.pitch_shifter.latency
+        voice.set_hangover(hangover)
+        
+    def select_output(self, device):
+        """Çıkış cihazını seç: adı saklanır, indeksi her açılışta addan bulunur"""
+        self.output_device = device
+        self.output_name = None if device is None else registry.device(device)['name']
+        
+    def arm(self):
+        """Akışı sessiz olarak aç, gecikme hattı SPACE'ten önce dolmaya başlar"""
+        if self.stream is None:
             try:
-                self.running = True
-                self.stream = sd.Stream(
-                    device=(None, self.output_device),
-                    samplerate=self.sample_rate,
-                    blocksize=256,
-                    latency='low',
-                    channels=2,
-                    callback=self.callback,
-                    dtype='float32'
-                )
+                if self.output_name is not None:
+                    # Liste yenilendiyse eski indeks başka bir cihazı gösterebilir
+                    self.output_device = registry.resolve(self.output_name)
+                    if self.output_device is None:
+                        raise ValueError(f"{self.output_name} bulunamadı")
+                input_info = registry.device(kind='input')
+                input_name = input_info['name']
+                output_name = registry.device(self.output_device)['name']
+                # Yönlendirmenin kullandığı tüm mikrofon kanalları açılır
+                self.input_channels = input_channel_count(input_info['max_input_channels'], self.routes)
+                if self.split_streams:
+                    # Her cihaz kendi hızında açılır, gecikme hattı çıkış hızında çalışır
+                    input_rate = int(input_info['default_samplerate'])
+                    self.sample_rate = int(registry.device(self.output_device)['default_samplerate'])
+                    self.link = StreamLink(
+                        input_rate, self.sample_rate, self.channels,
+                        self.blocksize, self.blocksize, dtype=self.dtype
+                    )
+                    self.load_latency(input_name, output_name)
+                    self.allocate_buffers()
+                    self.stream = sd.OutputStream(
+                        device=self.output_device,
+                        samplerate=self.sample_rate,
+                        blocksize=self.blocksize,
+                        latency='low',
+                        channels=self.channels,
+                        callback=self.output_callback,
+                        dtype=self.dtype
+                    )
+                    registry.track(self.stream)
+                    self.input_stream = sd.InputStream(
+                        device=None,
+                        samplerate=input_rate,
+                        blocksize=self.blocksize,
+                        latency='low',
+                        channels=self.input_channels,
+                        callback=self.input_callback,
+                        dtype=self.dtype
+                    )
+                    registry.track(self.input_stream)
+                    self.input_stream.start()
+                else:
+                    self.load_latency(input_name, output_name)
+                    self.allocate_buffers()
+                    self.stream = sd.Stream(
+                        device=(None, self.output_device),
+                        samplerate=self.sample_rate,
+                        blocksize=self.blocksize,
+                        latency='low',
+                        channels=(self.input_channels, self.channels),
+                        callback=self.callback,
+                        dtype=self.dtype
+                    )
+                    registry.track(self.stream)
                 self.stream.start()
-                self.led_status = True
-                return True
             except Exception as e:
                 print(f"Hata: {e}")
-                self.running = False
+                self.close_streams()
+                return False
+        return True
+        
+    def start(self):
+        """Çıkışı aç: akış zaten açıksa şiddet bir blokta yükselir"""
+        if not self.running:
+            if not self.arm():
                 return False
+            self.running = True
+            self.led_status = True
+            self.publish()
         return True
     
     def stop(self):
+        """Çıkışı kıs, akış ve gecikme hattı çalışmaya devam eder"""
         if self.running:
             self.running = False
             self.led_status = False
-            if self.stream:
-                self.stream.stop()
-                self.stream.close()
-                self.stream = None
+            self.publish()
+    
+    def disarm(self):
+        """Akışı tamamen kapat"""
+        self.stop()
+        self.stop_recording()
+        self.close_streams()
+        
+    def rescan(self, find_output):
+        """Akışları kapat, cihaz listesini yenile, çıkışı yeniden seç ve önceki durumu geri getir
+
+        Açık akış varken PortAudio yeniden başlatılamaz, bu yüzden hotplug
+        sonrası yenileme ancak akışlar kapatılınca yapılır.
+        """
+        running = self.running
+        self.disarm()
+        registry.rescan()
+        self.select_output(find_output())
+        return self.start() if running else self.arm()
+        
+    def close_streams(self):
+        """Açık akışları kapat, ayrı akış bağlantısını bırak"""
+        for stream in (self.input_stream, self.stream):
+            if stream is not None:
+                stream.stop()
+                stream.close()
+                registry.untrack(stream)
+        self.stream = None
+        self.input_stream = None
+        self.link = None
+        
+    def load_latency(self, input_name, output_name):
+        """Bu cihaz çifti için daha önce ölçülen gecikmeyi yükle"""
+        self.latency_key = latency_store.key(input_name, output_name, self.sample_rate)
+        seconds = latency_store.get(self.latency_key)
+        self.round_trip = None if seconds is None else int(seconds * self.sample_rate)
+        
+    def calibrate(self):
+        """Gidiş-dönüş gecikmesini ölç, kaydet ve gecikme hattını buna göre kısalt"""
+        if not self.arm():
+            return None
+        calibrator = LatencyCalibrator(self.sample_rate)
+        frames = calibrator.run(lambda calibration: setattr(self, 'calibration', calibration))
+        if frames is None:
+            return None
+        self.round_trip = frames
+        latency_store.set(self.latency_key, frames / self.sample_rate)
+        self.set_delay(self.delay)
+        self.set_modulation(self.modulate)
+        return frames / self.sample_rate
+        
+    def start_recording(self, path=None):
+        """Mikrofonu ve çıkışı dosyaya kaydetmeye başla, dosya yolunu döndür"""
+        if self.recorder is not None or not self.arm():
+            return None
+        if path is None:
+            path = time.strftime('session-%Y%m%d-%H%M%S.wav')
+        channels = self.input_audio.shape[1]
+        recorder = SessionRecorder(path, self.sample_rate, channels, channels, max_block=self.blocksize)
+        recorder.start()
+        self.recorder = recorder
+        return path
+        
+    def stop_recording(self):
+        """Kaydı durdur, kalanları dosyaya yaz ve kaydediciyi döndür"""
+        recorder = self.recorder
+        if recorder is None:
+            return None
+        # Önce callback'ten ayrılır, sonra yazıcı thread kapatılır
+        self.recorder = None
+        recorder.stop()
+        return recorder
 
 def find_bluetooth_device():
     """Bluetooth kulaklığı otomatik bul"""
-    devices = sd.query_devices()
     bluetooth_keywords = ['Redmi Buds 6 Play', 'K55', 'TWS', 'airpods', 'bt', 'bluetooth']
     
-    for i, device in enumerate(devices):
-        if device['max_output_channels'] > 2:  # Çıkış cihazı
-            device_name = device['name'].lower()
-            for keyword in bluetooth_keywords:
-                if keyword in device_name:
-                    print(f"Bluetooth cihazı bulundu: {device['name']} (ID: {i})")
-                    return i
+    device_id = registry.find(bluetooth_keywords, 'output')
+    if device_id is not None:
+        print(f"Bluetooth cihazı bulundu: {registry.device(device_id)['name']} (ID: {device_id})")
+        return device_id
     
     # Bluetooth bulunamazsa varsayılan çıkış cihazını kullan
-    default_output = sd.default.device[1]
-    print(f"Bluetooth cihazı bulunamadı. Varsayılan cihaz kullanılacak: {devices[default_output]['name']}")
+    default_output = registry.default_index('output')
+    print(f"Bluetooth cihazı bulunamadı. Varsayılan cihaz kullanılacak: {registry.device(default_output)['name']}")
     return default_output
 
-def led_indicator(jammer):
-    """LED yerine konsolda görsel gösterge"""
-    while True:
-        if jammer.led_status:
-            print("🔴", end="\r")  # Kırmızı nokta - aktif
-        else:
-            print("⚪", end="\r")  # Beyaz nokta - pasif
-        time.sleep(0.5)
+def voice_text(jammer):
+    """Sessizlik tasarrufu açıksa etkin yolun görev döngüsü"""
+    if jammer.voice is None:
+        return ""
+    return f" - görev döngüsü: %{jammer.voice.duty_cycle()*100:.0f}"
+
+def link_text(jammer):
+    """Ayrı akışlarda saat kayması ve gecikmenin hedeften sapması"""
+    link = jammer.link
+    if link is None:
+        return ""
+    text = f" - kayma: {link.drift_ppm():+.0f} ppm ({link.delay_error()*1000:+.1f} ms)"
+    ring = link.ring
+    if ring.overruns or ring.underruns or link.realigns:
+        text += f" - halka taşma/boşalma/hizalama: {ring.overruns}/{ring.underruns}/{link.realigns}"
+    return text
+
+def record_text(jammer):
+    """Kayıt açıksa süresi ve yer olmadığı için atılan örnekler"""
+    recorder = jammer.recorder
+    if recorder is None:
+        return ""
+    dropped = recorder.dropped()
+    return f" - kayıt: {recorder.seconds():.0f}s" + (f" ({dropped} örnek atıldı)" if dropped else "")
+
+def stage_text(jammer):
+    """Aşama ölçümü açıksa aşama başına ortalama/en büyük süre"""
+    chain = jammer.output_chain
+    if chain is None or chain.profiler is None:
+        return ""
+    return f" - {profile_text(chain.profiler.snapshot())}"
+
+def led_indicator(jammer, snapshot):
+    """LED yerine konsolda görsel gösterge ve callback sağlığı"""
+    if jammer.led_status:
+        print(f"🔴 {health_text(snapshot)}{voice_text(jammer)}{link_text(jammer)}{record_text(jammer)}{stage_text(jammer)}", end="\r")  # Kırmızı nokta - aktif
+    else:
+        print("⚪", end="\r")  # Beyaz nokta - pasif
 
 def main():
     print("🎤 Speech Jammer - Konuşma Kesici")
@@ -119,21 +513,42 @@ def main():
     )
     
     # LED göstergesi için thread
-    led_thread = threading.Thread(target=led_indicator, args=(jammer,), daemon=True)
+    led_thread = MonitorReporter(jammer.monitor, lambda snapshot: led_indicator(jammer, snapshot))
     led_thread.start()
     
+    # Akışı baştan sessiz aç, SPACE sadece çıkış şiddetini açıp kapatır
+    jammer.arm()
+    
     print("\n🎮 Kontroller:")
     print("SPACE = Başlat/Durdur")
     print("↑/↓ = Gecikmeyi artır/azalt (+/- 10ms)")
     print("→/← = Ses şiddetini artır/azalt")
+    print("M = Sürekli rastgele gecikme (180-220ms) aç/kapa")
+    print("F = Frekans kaydırma (FAF) aç/kapa")
+    print("V = Sessizlikte tasarruf modu aç/kapa")
+    print("C = Gecikme kalibrasyonu (kulaklığı mikrofona yaklaştırın)")
+    print("K = Oturum kaydı başlat/durdur (mikrofon + çıkış, WAV)")
+    print("P = Çıkış aşamalarının süresini göster/gizle")
+    print("D = Gecikmesiz sesi karıştır (%0 / %25 / %50)")
+    print("F5 = Cihazları yeniden tara (sonradan bağlanan kulaklık için)")
     print("ESC veya Q = Çıkış")
     print("\n⏰ Mevcut gecikme: 180ms")
     print("🔊 Ses şiddeti: %90")
     
+    # Klavye olayları komut kuyruğuna düşer
+    controls = KeyControls(KEY_BINDINGS)
+    controls.start()
+    
+    # Ses kartı ya da Bluetooth kulaklık takılıp çıkarılınca F5 gibi yeniden taranır
+    watch_hotplug(registry, on_change=lambda: controls.post('rescan'))
+    
     try:
         while True:
+            # Tuş gelene kadar bekle, boşta CPU kullanılmaz
+            action = controls.get()
+            
             # SPACE tuşu - Başlat/Durdur
-            if keyboard.is_pressed('space'):
+            if action == 'toggle':
                 if jammer.running:
                     jammer.stop()
                     print(f"⏹️  Durduruldu")
@@ -142,49 +557,95 @@ def main():
                         print(f"▶️  Başlatıldı - Gecikme: {jammer.delay*1000:.0f}ms")
                     else:
                         print("❌ Başlatılamadı!")
-                time.sleep(0.5)  # Tuş baskısını önle
             
             # YUKARI ok - Gecikmeyi artır
-            elif keyboard.is_pressed('up'):
-                jammer.delay = min(0.5, jammer.delay + 0.01)
-                if jammer.running:
-                    jammer.stop()
-                    jammer.start()
+            elif action == 'delay_up':
+                jammer.set_delay(min(0.5, jammer.delay + 0.01))
                 print(f"⏰ Gecikme: {jammer.delay*1000:.0f}ms")
-                time.sleep(0.3)
             
             # AŞAĞI ok - Gecikmeyi azalt
-            elif keyboard.is_pressed('down'):
-                jammer.delay = max(0.05, jammer.delay - 0.01)
-                if jammer.running:
-                    jammer.stop()
-                    jammer.start()
+            elif action == 'delay_down':
+                jammer.set_delay(max(0.05, jammer.delay - 0.01))
                 print(f"⏰ Gecikme: {jammer.delay*1000:.0f}ms")
-                time.sleep(0.3)
             
             # SAĞ ok - Ses şiddetini artır
-            elif keyboard.is_pressed('right'):
-                jammer.feedback_gain = min(1.0, jammer.feedback_gain + 0.1)
+            elif action == 'gain_up':
+                jammer.set_gain(min(1.0, jammer.feedback_gain + 0.1))
                 print(f"🔊 Ses şiddeti: %{jammer.feedback_gain*100:.0f}")
-                time.sleep(0.3)
             
             # SOL ok - Ses şiddetini azalt
-            elif keyboard.is_pressed('left'):
-                jammer.feedback_gain = max(0.1, jammer.feedback_gain - 0.1)
+            elif action == 'gain_down':
+                jammer.set_gain(max(0.1, jammer.feedback_gain - 0.1))
                 print(f"🔊 Ses şiddeti: %{jammer.feedback_gain*100:.0f}")
-                time.sleep(0.3)
+            
+            # M - Sürekli rastgele gecikme
+            elif action == 'modulate':
+                jammer.set_modulation(not jammer.modulate)
+                print(f"🌊 Sürekli rastgele gecikme: {'açık' if jammer.modulate else 'kapalı'}")
+            
+            # F - Frekansı değiştirilmiş geri besleme
+            elif action == 'faf':
+                jammer.set_faf(not jammer.faf)
+                print(f"🎵 FAF ({jammer.faf_semitones:+d} yarım ton): {'açık' if jammer.faf else 'kapalı'}")
+            
+            # V - Konuşma algılama ile sessizlikte tasarruf
+            elif action == 'voice_gate':
+                jammer.set_voice_gate(not jammer.voice_gate)
+                print(f"🔋 Sessizlikte tasarruf: {'açık' if jammer.voice_gate else 'kapalı'}")
+            
+            # C - Cihaz gecikmesini ölç ve gecikmeden düş
+            elif action == 'calibrate':
+                print("📏 Kalibrasyon sinyali çalınıyor...")
+                latency = jammer.calibrate()
+                if latency is None:
+                    print("❌ Kalibrasyon başarısız: sinyal mikrofondan net duyulmadı")
+                else:
+                    print(f"📏 Cihaz gecikmesi: {latency*1000:.0f}ms, ayarlanan gecikmeden düşüldü")
+                    if latency > jammer.delay:
+                        print(f"⚠️ Cihaz gecikmesi {jammer.delay*1000:.0f}ms gecikmeden uzun, daha kısa gecikme verilemez")
+            
+            # K - Mikrofonu ve çıkışı dosyaya kaydet
+            elif action == 'record':
+                if jammer.recorder is None:
+                    path = jammer.start_recording()
+                    if path is None:
+                        print("❌ Kayıt başlatılamadı!")
+                    else:
+                        print(f"⏺️  Kayıt başladı: {path}")
+                else:
+                    recorder = jammer.stop_recording()
+                    print(f"⏹️  Kayıt bitti: {recorder.path} ({recorder.seconds():.1f}s, {recorder.dropped()} örnek atıldı)")
+            
+            # P - Aşama başına süre ölçümü
+            elif action == 'profile':
+                jammer.set_profiling(not jammer.profile_stages)
+                print(f"⏱️  Aşama ölçümü: {'açık' if jammer.profile_stages else 'kapalı'}")
+            
+            # D - Gecikmesiz sesin karışım oranı
+            elif action == 'dry':
+                levels = jammer.dry_levels
+                next_level = levels[(levels.index(jammer.dry_mix) + 1) % len(levels)] if jammer.dry_mix in levels else levels[0]
+                jammer.set_dry(next_level)
+                print(f"🎧 Gecikmesiz ses: %{jammer.dry_mix*100:.0f}")
+            
+            # F5 ya da hotplug - Cihazları yeniden tara, çıkışı yeniden seç
+            elif action == 'rescan':
+                print("\n🔄 Cihazlar yeniden taranıyor...")
+                if jammer.rescan(find_bluetooth_device):
+                    print(f"🎧 Çıkış: {jammer.output_name or 'varsayılan cihaz'}")
+                else:
+                    print("❌ Akış yeniden açılamadı!")
             
             # ESC veya Q - Çıkış
-            elif keyboard.is_pressed('esc') or keyboard.is_pressed('q'):
+            elif action == 'quit':
                 print("\n👋 Program sonlandırılıyor...")
                 break
-            
-            time.sleep(0.05)
     
     except KeyboardInterrupt:
         print("\n👋 Program sonlandırılıyor...")
     finally:
-        jammer.stop()
+        controls.stop()
+        jammer.disarm()
         sys.exit(0)
 
 if __name__ == "__main__":
@@ -2,110 +2,132 @@
 
 import sounddevice as sd
 import numpy as np
-import queue
 import threading
+from delay_line import DelayLine
+from routing import input_channel_count, routing_matrix
+from dsp_chain import StageChain, Invert
+from device_registry import registry, watch_hotplug
+from instrumentation import CallbackMonitor, MonitorReporter
 
 class SpeechJammer:
-    def __init__(self, delay=0.3, invert_phase=False, output_device=None):
+    def __init__(self, delay=0.3, invert_phase=False, output_device=None, routes=None):
         self.delay = delay  # saniye cinsinden gecikme
         self.invert_phase = invert_phase
-        self.output_device = output_device
+        self.output_device = None
+        self.output_name = None  # Yenilemeden sonra indeks değişebilir, cihaz adıyla bulunur
+        self.select_output(output_device)
+        self.routes = routes  # Kullanıcı tanımlı kanal yönlendirmesi, örn. [(2, 0)]
         self.sample_rate = 44100
         self.channels = 2
-        self.buffer = queue.Queue()
+        self.input_channels = 2
+        self.blocksize = 1024
+        self.dtype = 'float32'
+        self.delay_line = None
+        self.output_chain = None
+        self.monitor = CallbackMonitor(self.sample_rate, self.blocksize)
         self.stream = None
 
+    def allocate_buffers(self):
+        """Gecikme hattını cihazın örnekleme hızına göre örnek hassasiyetinde ayır"""
+        # Çıkış aşamaları (isteğe bağlı faz ters çevirme) yönlendirmeden sonra yerinde çalışır
+        stages = [Invert()] if self.invert_phase else []
+        self.output_chain = StageChain(stages).build(self.blocksize, self.channels, self.dtype)
+        delay_frames = max(0, int(self.delay * self.sample_rate) - self.output_chain.latency)
+        self.delay_line = DelayLine(delay_frames, self.input_channels, dtype=self.dtype, max_block=self.blocksize)
+        self.delayed_data = np.zeros((self.blocksize, self.input_channels), dtype=self.dtype)
+        self.routing = routing_matrix(self.input_channels, self.channels, self.routes, self.dtype)
+        self.monitor.reset(self.sample_rate, self.blocksize)
+
     def callback(self, indata, outdata, frames, time, status):
-        if status:
-            print(status)
-        
-        # Giriş verisini buffer'a koy
-        self.buffer.put(indata.copy())
+        # Ses thread'inde print yok, durum bayrakları sayaçlara yazılır
+        start = self.monitor.begin(status)
         
-        # Gecikme süresine karşılık gelen frame sayısı
-        delay_frames = int(self.delay * self.sample_rate)
+        # Girişi tampona yaz, tam olarak delay kadar önceki sesi al
+        delayed_data = self.delayed_data[:frames]
+        self.delay_line.process(indata, delayed_data)
         
-        # Buffer'da yeterli veri var mı kontrol et
-        if self.buffer.qsize() > delay_frames // frames:
-            try:
-                # Gecikmiş veriyi al
-                delayed_data = self.buffer.get()
-                # Eğer kanal sayıları uyuşmuyorsa, uygun hale getir
-                if delayed_data.shape[1] != outdata.shape[1]:
-                    # Kanal uyumsuzluğunu gider: ilk kanalları kopyala
-                    min_channels = min(delayed_data.shape[1], outdata.shape[1])
-                    outdata[:, :min_channels] = delayed_data[:, :min_channels]
-                    # Kalan kanalları sıfırla
-                    if outdata.shape[1] > min_channels:
-                        outdata[:, min_channels:] = 0
-                else:
-                    outdata[:] = delayed_data
-                
-                # İsteğe bağlı faz ters çevirme
-                if self.invert_phase:
-                    outdata[:] = -outdata
-            except queue.Empty:
-                print("Buffer yeterli değil, sıfır dolduruluyor.")
-                outdata[:] = 0
-        else:
-            # Henüz yeterli veri yoksa, sıfır ver
-            outdata[:] = 0
+        # Kanal eşleme tek çarpımda, sonra çıkış aşamaları
+        np.dot(delayed_data, self.routing, out=outdata)
+        self.output_chain.run(outdata)
+        self.monitor.end(start)
+
+    def select_output(self, device):
+        """Çıkış cihazını seç: adı saklanır, indeksi her açılışta addan bulunur"""
+        self.output_device = device
+        self.output_name = None if device is None else registry.device(device)['name']
 
     def start(self):
-        # Cihaz bilgilerini al
-        devices = sd.query_devices()
+        # Liste yenilendiyse eski indeks başka bir cihazı gösterebilir
+        if self.output_name is not None:
+            self.output_device = registry.resolve(self.output_name)
+            if self.output_device is None:
+                raise ValueError(f"{self.output_name} bulunamadı")
+        # Cihaz bilgilerini kayıttan al, PortAudio tekrar sorgulanmaz
         if self.output_device is not None:
             # Çıkış cihazının kanal sayısını al
-            self.channels = devices[self.output_device]['max_output_channels']
+            self.channels = registry.device(self.output_device)['max_output_channels']
             # Eğer çıkış cihazı 2 kanaldan az ise, 2 yapalım (genellikle stereo)
             if self.channels < 2:
                 self.channels = 2
         else:
             # Varsayılan çıkış cihazının kanal sayısı
-            self.channels = devices[sd.default.device[1]]['max_output_channels']
+            self.channels = registry.device(kind='output')['max_output_channels']
             if self.channels < 2:
                 self.channels = 2
 
-        self.sample_rate = sd.query_devices(self.output_device)['default_samplerate']
+        self.sample_rate = registry.device(self.output_device)['default_samplerate']
+        # Yönlendirmenin kullandığı tüm mikrofon kanalları açılır
+        self.input_channels = input_channel_count(registry.device(kind='input')['max_input_channels'], self.routes)
+        self.allocate_buffers()
 
         self.stream = sd.Stream(
             device=(None, self.output_device),
             samplerate=self.sample_rate,
-            blocksize=1024,
+            blocksize=self.blocksize,
             latency='low',
-            channels=(2, self.channels),  # Giriş 2 kanal (mikrofon), çıkış bulduğumuz kanal sayısı
-            callback=self.callback
+            channels=(self.input_channels, self.channels),  # Giriş yönlendirmenin kullandığı kanallar, çıkış bulduğumuz kanal sayısı
+            callback=self.callback,
+            dtype=self.dtype
         )
+        registry.track(self.stream)
         self.stream.start()
 
     def stop(self):
         if self.stream:
             self.stream.stop()
             self.stream.close()
+            registry.untrack(self.stream)
             self.stream = None
 
 def main():
     print("Speech Jammer Programı")
     print("Mevcut cihazlar:")
-    print(sd.query_devices())
+    watch_hotplug(registry)
+    registry.ensure()
+    for i, device in enumerate(registry.devices):
+        print(f"{i}: {device['name']} (IN: {device['max_input_channels']}, OUT: {device['max_output_channels']})")
     
     # Bluetooth cihazını otomatik bul
     target_output_device = "Redmi Buds 6 Play"  # Kendi cihazınızın adına göre değiştirin
-    output_device = None
-    devices = sd.query_devices()
-    for i, device in enumerate(devices):
-        if target_output_device.lower() in device['name'].lower() and device['max_output_channels'] > 0:
-            output_device = i
-            print(f"Bluetooth çıkış cihazı bulundu: {device['name']} (ID: {i})")
-            break
-    
-    if output_device is None:
+    def find_output():
+        output_device = registry.find([target_output_device], 'output')
+        if output_device is not None:
+            print(f"Bluetooth çıkış cihazı bulundu: {registry.device(output_device)['name']} (ID: {output_device})")
+            return output_device
         print("Bluetooth çıkış cihazı bulunamadı. Varsayılan cihaz kullanılacak.")
-        output_device = sd.default.device[1]  # Varsayılan çıkış cihazı
+        return registry.default_index('output')  # Varsayılan çıkış cihazı
     
-    jammer = SpeechJammer(delay=0.3, invert_phase=False, output_device=output_device)
+    jammer = SpeechJammer(delay=0.3, invert_phase=False, output_device=find_output())
     
-    print("Press Enter to start/stop, 'q' to quit:")
+    # Yeni xrun olduğunda ses thread'i dışından bildir
+    reported = {'xruns': 0}
+    def report_xruns(snapshot):
+        if snapshot['xrun_total'] > reported['xruns']:
+            print(f"Ses durumu: {snapshot['xruns']}")
+        reported['xruns'] = snapshot['xrun_total']
+    MonitorReporter(jammer.monitor, report_xruns, interval=1.0).start()
+    
+    print("Press Enter to start/stop, 'r' to rescan devices, 'q' to quit:")
     
     while True:
         user_input = input()
@@ -113,11 +135,20 @@ def main():
             print("Program sonlandırılıyor.")
             jammer.stop()
             break
+        elif user_input == 'r':
+            # Sonradan bağlanan kulaklık için: akış kapatılır, liste yenilenir
+            jammer.stop()
+            registry.rescan()
+            jammer.select_output(find_output())
+            print("Cihazlar yeniden tarandı. Başlatmak için Enter.")
         else:
             if jammer.stream and jammer.stream.active:
                 jammer.stop()
                 print("Durduruldu.")
             else:
+                if registry.dirty:
+                    # Hotplug sonrası kulaklık yeniden aranır
+                    jammer.select_output(find_output())
                 try:
                     jammer.start()
                     print("Başlatıldı. Gecikme: {} ms".format(jammer.delay * 1000))
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+import ctypes
+import ctypes.util
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from select import select
+
+import sounddevice as sd
+
+class DeviceRegistry:
+    """Ses cihazı listesinin tek bir kopyası ve anahtar kelime indeksi
+
+    PortAudio sadece ilk kullanımda, bir hotplug sinyalinden sonra veya
+    rescan() çağrılınca sorgulanır. İsimler bir kez küçük harfe çevrilir,
+    her anahtar kelimenin eşleştiği cihazlar indekste saklanır.
+    Yeniden tarama PortAudio'yu yeniden başlatır (Pa_Terminate süreçteki
+    tüm akışları kapatır). Bu yüzden betikler açtıkları akışları track()
+    ile bildirir; açık akış varken aramalar önbellekteki listeyi kullanır
+    ve yenileme son akış untrack() ile bırakılınca yapılır. İndeksler
+    yenilemeden sonra değişebilir; akışı yeniden açan betikler cihazı
+    adıyla saklayıp resolve() ile güncel indeksi alır.
+    """
+    def __init__(self, keywords=()):
+        self.keywords = [keyword.lower() for keyword in keywords]
+        self.devices = []
+        self.names = []
+        self.index = {}
+        self.default = (None, None)
+        self.dirty = True
+        self.initialized = False
+        self.streams = set()  # Açık akışlar, boş değilken PortAudio yeniden başlatılmaz
+
+    def snapshot(self):
+        """Cihaz listesini al ve indeksi yeniden kur, açık akış varsa ertele"""
+        if self.initialized:
+            if self.streams:
+                self.dirty = True
+                return False
+            if not restart_portaudio():
+                self.dirty = False
+                return False
+        self.initialized = True
+        self.dirty = False
+        self.devices = [dict(device) for device in sd.query_devices()]
+        self.names = [device['name'].lower() for device in self.devices]
+        self.default = tuple(sd.default.device)
+        self.index = {}
+        for keyword in self.keywords:
+            self.matches(keyword)
+        return True
+
+    def invalidate(self):
+        """Hotplug sinyali: bir sonraki aramada liste yenilenir"""
+        self.dirty = True
+
+    def rescan(self):
+        return self.snapshot()
+
+    def ensure(self):
+        if self.dirty and not self.streams:
+            self.snapshot()
+
+    def track(self, stream):
+        """Açılan akışı bildir, kapanana kadar PortAudio yeniden başlatılmaz"""
+        self.streams.add(stream)
+
+    def untrack(self, stream):
+        """Kapanan akışı bırak, bekleyen yenileme bir sonraki aramada yapılır"""
+        self.streams.discard(stream)
+
+    def matches(self, keyword):
+        """Adında keyword geçen cihazların indeksleri"""
+        keyword = keyword.lower()
+        found = self.index.get(keyword)
+        if found is None:
+            found = [i for i, name in enumerate(self.names) if keyword in name]
+            self.index[keyword] = found
+        return found
+
+    def find(self, keywords, kind='output', min_channels=1):
+        """Anahtar kelimelerden birine uyan ilk cihazı bul (yoksa None)"""
+        self.ensure()
+        channels = f'max_{kind}_channels'
+        candidates = set()
+        for keyword in keywords:
+            candidates.update(self.matches(keyword))
+        for i in sorted(candidates):
+            if self.devices[i][channels] >= min_channels:
+                return i
+        return None
+
+    def device(self, index=None, kind='output'):
+        """Cihaz bilgisini kopyadan döndür, index None ise varsayılan cihaz"""
+        self.ensure()
+        if index is None:
+            index = self.default[0 if kind == 'input' else 1]
+        return self.devices[index]
+
+    def resolve(self, name, kind='output'):
+        """Tam adı verilen cihazın güncel indeksi (yoksa None)"""
+        self.ensure()
+        channels = f'max_{kind}_channels'
+        for i, device in enumerate(self.devices):
+            if device['name'] == name and device[channels] > 0:
+                return i
+        return None
+
+    def default_index(self, kind='output'):
+        self.ensure()
+        return self.default[0 if kind == 'input' else 1]
+
+    def first(self, kind='output'):
+        """Verilen yönde kanalı olan ilk cihaz"""
+        self.ensure()
+        channels = f'max_{kind}_channels'
+        for i, device in enumerate(self.devices):
+            if device[channels] > 0:
+                return i
+        return None
+
+
+def restart_portaudio():
+    """PortAudio'yu yeniden başlat, cihaz listesi sadece böyle yenilenir
+
+    sounddevice bunun için genel bir API sunmaz; kendi belgelerinde önerilen
+    _terminate()/_initialize() çağrıları tek yerde burada yapılır. Bu
+    fonksiyonlar yoksa False döner ve eski liste kullanılmaya devam eder.
+    """
+    terminate = getattr(sd, '_terminate', None)
+    initialize = getattr(sd, '_initialize', None)
+    if terminate is None or initialize is None:
+        return False
+    terminate()
+    initialize()
+    return True
+
+
+# pactl subscribe satırı: uç nokta ya da kart eklendi/kaldırıldı
+# (sink-input/source-output akışlardır, kendi akışlarımız da onlardandır)
+PACTL_EVENT = re.compile(r"Event '(new|remove)' on (sink|source|card) #")
+
+
+def watch_hotplug(registry, path='/dev/snd', on_change=None, settle=1.0):
+    """Linux'ta ses cihazları değişince registry'yi geçersiz kıl
+
+    İki kaynak izlenir: path altındaki ses kartı düğümleri (inotify, libc
+    üzerinden) ve pactl varsa PulseAudio/PipeWire uç noktaları. Bluetooth
+    kulaklıklar /dev/snd'de düğüm açmaz, sadece ikincisinde görünür.
+    on_change verilirse olaylar durulduktan settle saniye sonra bir kez
+    çağrılır; açık akışları kapatıp rescan() yapmak çağıranın işidir.
+    Başlatılan thread'lerin listesini döndürür, diğer sistemlerde boştur
+    ve liste sadece rescan() ile yenilenir.
+    """
+    if not sys.platform.startswith('linux'):
+        return []
+    pending = [None]
+    lock = threading.Lock()
+
+    def changed():
+        registry.invalidate()
+        if on_change is None:
+            return
+        # Bir kulaklık bağlanırken kart, sink ve source art arda gelir
+        with lock:
+            if pending[0] is not None:
+                pending[0].cancel()
+            pending[0] = threading.Timer(settle, on_change)
+            pending[0].daemon = True
+            pending[0].start()
+
+    threads = [watch_device_nodes(path, changed), watch_pulse(changed)]
+    return [thread for thread in threads if thread is not None]
+
+
+def watch_device_nodes(path, changed):
+    """path altında düğüm eklenip silinince changed() çağır"""
+    if not os.path.isdir(path):
+        return None
+    libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    fd = libc.inotify_init1(os.O_CLOEXEC)
+    if fd < 0:
+        return None
+    # IN_CREATE | IN_DELETE | IN_ATTRIB
+    if libc.inotify_add_watch(fd, path.encode(), 0x100 | 0x200 | 0x4) < 0:
+        os.close(fd)
+        return None
+
+    def run():
+        while True:
+            select([fd], [], [])
+            os.read(fd, 4096)
+            changed()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def watch_pulse(changed):
+    """pactl subscribe ile sink/source/kart eklenip kaldırılınca changed() çağır"""
+    pactl = shutil.which('pactl')
+    if pactl is None:
+        return None
+    # Olay satırları çevrilir, eşleşme için C yerel ayarı kullanılır
+    env = dict(os.environ, LC_ALL='C')
+    try:
+        process = subprocess.Popen([pactl, 'subscribe'], stdout=subprocess.PIPE,
+                                   stderr=subprocess.DEVNULL, text=True, env=env)
+    except OSError:
+        return None
+
+    def run():
+        for line in process.stdout:
+            if PACTL_EVENT.search(line):
+                changed()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+BLUETOOTH_KEYWORDS = ['redmi buds 6 play', 'k55', 'tws', 'bose', 'sony', 'jbl', 'airpods', 'bt', 'bluetooth', 'kulaklık']
+
+# Tüm betiklerin paylaştığı kayıt
+registry = DeviceRegistry(BLUETOOTH_KEYWORDS)
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+
+import time
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from gain_ramp import GainRamp
+
+class Stage:
+    """Zincirin bir aşaması: bloğu yerinde işler
+
+    Durumunu ve tamponlarını allocate() içinde kendisi ayırır, process()
+    yeni dizi oluşturmaz. params bloğun başında alınan değişmez parametre
+    görüntüsüdür (params.Params), tüm aşamalar aynı görüntüyü görür.
+    latency aşamanın sese eklediği gecikmedir (örnek). mutes() ve adds()
+    StageChain.muted() içindir: aşama bu blokta çıkışı kesin sıfırlıyor mu,
+    bloktan bağımsız bir sinyal ekliyor mu.
+    """
+    name = 'aşama'
+    latency = 0
+
+    def allocate(self, blocksize, channels, dtype):
+        pass
+
+    def mutes(self, params):
+        return False
+
+    def adds(self, params):
+        return False
+
+    def process(self, block, params):
+        raise NotImplementedError
+
+
+class Gain(Stage):
+    """Şiddeti her blokta target(params)'tan al, değişince blok boyunca rampala"""
+    name = 'şiddet'
+
+    def __init__(self, target, initial=0.0):
+        self.target = target
+        self.initial = initial
+
+    def allocate(self, blocksize, channels, dtype):
+        self.ramp = GainRamp(blocksize, dtype=dtype, gain=self.initial)
+
+    def process(self, block, params):
+        self.ramp.apply(block, self.target(params))
+
+    def mutes(self, params):
+        # Hedef 0 ve rampa oraya inip oturdu
+        return self.ramp.gain == 0.0 and self.target(params) == 0.0
+
+
+class Invert(Stage):
+    """Fazı ters çevir"""
+    name = 'faz'
+
+    def process(self, block, params):
+        np.negative(block, out=block)
+
+
+class Mix(Stage):
+    """Bloğa source tamponundaki sinyali dry(params) oranında ekle
+
+    source callback'in her blokta doldurduğu hazır tampondur (örneğin
+    gecikmesiz mikrofon), ilk len(block) satırı kullanılır. Oran değişince
+    blok boyunca doğrusal rampalanır; oran 0'da kaldıkça aşama bloğa
+    dokunmaz.
+    """
+    name = 'karışım'
+
+    def __init__(self, source, dry):
+        self.source = source
+        self.dry = dry
+
+    def allocate(self, blocksize, channels, dtype):
+        self.scratch = np.zeros((blocksize, channels), dtype=dtype)
+        self.ramp = GainRamp(blocksize, dtype=dtype)
+
+    def adds(self, params):
+        return self.dry(params) != 0.0 or self.ramp.gain != 0.0
+
+    def process(self, block, params):
+        dry = self.dry(params)
+        if dry == 0.0 and self.ramp.gain == 0.0:
+            return
+        scratch = self.scratch[:len(block)]
+        np.copyto(scratch, self.source[:len(block)])
+        self.ramp.apply(scratch, dry)
+        np.add(block, scratch, out=block)
+
+
+class Limiter(Stage):
+    """İleriye bakan tepe sınırlayıcı, örnek başına döngü olmadan
+
+    Ses lookahead - 1 örnek geciktirilir. Gereken kazanç (eşik / tepe)
+    lookahead penceresinde en küçüğe indirilir, serbest bırakma en fazla
+    release saniyede 0'dan 1'e çıkacak doğrusal eğimle sınırlanır
+    (kümülatif minimum ile) ve pencere ortalamasıyla yumuşatılır. Böylece
+    kazanç tepeye lookahead örnekte doğrusal iner ve tepe hiçbir zaman
+    eşiği geçmez.
+    """
+    name = 'sınırlayıcı'
+
+    def __init__(self, sample_rate, threshold=0.98, lookahead=0.0015, release=0.05):
+        self.threshold = threshold
+        self.window = max(2, int(lookahead * sample_rate))
+        self.latency = self.window - 1
+        self.rise = 1.0 / max(1.0, release * sample_rate)
+
+    def allocate(self, blocksize, channels, dtype):
+        history = self.latency
+        self.audio = np.zeros((history + blocksize, channels), dtype=dtype)
+        self.required = np.ones(history + blocksize, dtype=dtype)
+        self.held = np.ones(history + blocksize, dtype=dtype)
+        # Pencere görünümleri bir kez kurulur, satır n örnek n'in penceresidir
+        self.required_windows = sliding_window_view(self.required, self.window)
+        self.held_windows = sliding_window_view(self.held, self.window)
+        self.gains = np.zeros((blocksize, 1), dtype=dtype)
+        self.magnitude = np.zeros((blocksize, channels), dtype=dtype)
+        self.slope = (self.rise * np.arange(blocksize)).astype(dtype)
+        self.gain = 1.0
+        self.reduction = 1.0  # Son blokta uygulanan en küçük kazanç
+
+    def process(self, block, params):
+        frames = len(block)
+        history = self.latency
+        total = history + frames
+
+        # Örnek başına gereken kazanç: eşik / kanallardaki en büyük tepe
+        magnitude = self.magnitude[:frames]
+        np.abs(block, out=magnitude)
+        required = self.required[history:total]
+        np.max(magnitude, axis=1, out=required)
+        np.maximum(required, self.threshold, out=required)
+        np.divide(self.threshold, required, out=required)
+
+        # Pencere boyunca en küçük kazanç tutulur
+        held = self.held[history:total]
+        np.minimum.reduce(self.required_windows[:frames], axis=1, out=held)
+
+        # Serbest bırakma: g[n] = min(hedef[n], g[n-1] + eğim), kümülatif minimumla
+        slope = self.slope[:frames]
+        held -= slope
+        np.minimum.accumulate(held, out=held)
+        np.minimum(held, self.gain + self.rise, out=held)
+        held += slope
+        self.gain = float(held[-1])
+
+        # Pencere ortalaması: kazanç tepeye doğrusal iner
+        gains = self.gains[:frames, 0]
+        np.add.reduce(self.held_windows[:frames], axis=1, out=gains)
+        gains *= 1.0 / self.window
+        self.reduction = float(gains.min())
+
+        # Sesi pencere kadar geciktir ve kazancı uygula
+        self.audio[history:total] = block
+        np.multiply(self.audio[:frames], self.gains[:frames], out=block)
+
+        # Sonraki blok için geçmişi başa taşı
+        self.audio[:history] = self.audio[frames:total]
+        self.required[:history] = self.required[frames:total]
+        self.held[:history] = self.held[frames:total]
+
+
+class StageProfiler:
+    """Aşama başına toplam ve en büyük süre, sadece ses thread'i yazar"""
+    def __init__(self, names):
+        self.names = list(names)
+        self.reset()
+
+    def reset(self):
+        self.totals = [0.0] * len(self.names)
+        self.peaks = [0.0] * len(self.names)
+        self.blocks = 0
+
+    def add(self, index, seconds):
+        self.totals[index] += seconds
+        if seconds > self.peaks[index]:
+            self.peaks[index] = seconds
+
+    def snapshot(self):
+        """(ad, ortalama µs, en büyük µs) listesi, ses thread'i dışında çağrılır"""
+        blocks = max(self.blocks, 1)
+        return [(name, total / blocks * 1e6, peak * 1e6)
+                for name, total, peak in zip(self.names, list(self.totals), list(self.peaks))]
+
+
+class StageChain:
+    """Aşamaları sırayla yerinde çalıştıran düz liste
+
+    build() akış açılırken bir kez çağrılır: her aşama tamponlarını ayırır
+    ve process metodları bir demete bağlanır. Callback sadece
+    run(block, params) çağırır. profile(True) ile her aşamanın süresi StageProfiler'a yazılır.
+    """
+    def __init__(self, stages=()):
+        self.stages = list(stages)
+        self.calls = ()
+        self.latency = 0
+        self.profiler = None
+        self.run = self._run
+
+    def build(self, blocksize, channels, dtype):
+        for stage in self.stages:
+            stage.allocate(blocksize, channels, dtype)
+        self.calls = tuple(stage.process for stage in self.stages)
+        self.latency = sum(stage.latency for stage in self.stages)
+        if self.profiler is not None:
+            self.profile(True)
+        return self
+
+    def profile(self, enabled):
+        """Aşama süre ölçümünü aç/kapat, kapalıyken ek maliyet yoktur"""
+        if enabled:
+            self.profiler = StageProfiler(stage.name for stage in self.stages)
+            self.run = self._run_profiled
+        else:
+            self.profiler = None
+            self.run = self._run
+        return self.profiler
+
+    def muted(self, params=None):
+        """Bu blokta çıkış kesin sessiz mi: susturan bir aşamadan sonra ekleyen yok
+
+        Callback'ler bunu gecikme/FAF/zinciri atlayıp sadece gecikme
+        hattına yazmak için kullanır (şiddet 0'a inip oturduysa).
+        """
+        muted = False
+        for stage in self.stages:
+            if stage.adds(params):
+                muted = False
+            if stage.mutes(params):
+                muted = True
+        return muted
+
+    def _run(self, block, params=None):
+        for call in self.calls:
+            call(block, params)
+
+    def _run_profiled(self, block, params=None):
+        profiler = self.profiler
+        clock = time.perf_counter
+        last = clock()
+        for index, call in enumerate(self.calls):
+            call(block, params)
+            now = clock()
+            profiler.add(index, now - last)
+            last = now
+        profiler.blocks += 1
+
+
+def profile_text(snapshot):
+    """Konsolda gösterilecek aşama maliyetleri"""
+    return " - ".join(f"{name}: {mean:.0f}/{peak:.0f}µs" for name, mean, peak in snapshot)
+
+
+def output_chain(sample_rate, limit=True, initial=0.0, dry_source=None):
+    """Betiklerin ortak çıkış zinciri: params.gain şiddeti, dry_source verilirse
+    params.dry oranında gecikmesiz ses ve isteğe bağlı sınırlayıcı"""
+    stages = [Gain(lambda params: params.gain, initial)]
+    if dry_source is not None:
+        stages.append(Mix(dry_source, lambda params: params.dry))
+    if limit:
+        stages.append(Limiter(sample_rate))
+    return StageChain(stages)
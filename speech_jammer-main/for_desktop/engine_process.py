@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""SpeechJammer'ın ses akışını ve gecikme hattını ayrı bir süreçte çalıştır
+
+Aynı süreçte ses callback'i GIL'i klavye dinleyicisi, durum satırı ve
+diğer arayüz thread'leriyle paylaşır; bunların her biri callback'i
+geciktirebilir. Burada motor (akış + gecikme hattı + çıkış zinciri)
+kendi sürecinde çalışır ve GIL'ini kimseyle paylaşmaz. Denetleyici
+süreç sadece paylaşılan belleğe ayar yazar ve ölçümleri okur; iki süreç
+arasında kilit ya da kuyruk yoktur. Motor isteğe bağlı olarak SCHED_FIFO
+önceliği ve mlockall ister (Linux, yetki gerekir).
+
+Kullanım:
+    python3 engine_process.py
+    python3 engine_process.py --realtime --lock-memory --priority 70
+"""
+
+import argparse
+import ctypes
+import importlib.util
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from instrumentation import XRUN_FLAGS, CallbackMonitor, MonitorReporter, health_text
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Kontrol bölümü: sadece denetleyici yazar, version en son artırılır
+CONTROL_FIELDS = ('version', 'quit', 'running', 'delay', 'gain', 'modulate', 'faf', 'voice_gate')
+# Ölçüm bölümü: sadece motor yazar, sequence ile korunur
+METER_FIELDS = ('sequence', 'state', 'realtime', 'locked', 'period', 'callbacks',
+                'max_duration', 'max_jitter') + XRUN_FLAGS
+CONTROL = {name: index for index, name in enumerate(CONTROL_FIELDS)}
+METER = {name: index for index, name in enumerate(METER_FIELDS)}
+
+# Motor durumu
+STARTING, ARMED, STOPPED, FAILED = 0, 1, 2, -1
+# realtime / locked alanları: istenmedi, alındı, alınamadı
+NOT_REQUESTED, GRANTED, DENIED = 0, 1, -1
+
+MCL_CURRENT = 1
+MCL_FUTURE = 2
+
+
+class SharedState:
+    """Denetleyici ile motor arasındaki paylaşılan bellek
+
+    Tüm alanlar tek bir float64 dizisindedir, hizalı 8 baytlık bir yazma
+    yarım görülmez. Her bölümün tek yazarı vardır. Kontrol bölümünde
+    denetleyici önce alanları yazar, sonra version'ı artırır; motor
+    version değişince alanları okur, bu sırada yeni bir yazma olduysa
+    bir sonraki turda tekrar uygular. Ölçüm bölümünü motor bir sıra
+    sayacıyla (seqlock) yazar: yazarken sayaç tektir, okuyucu tek ya da
+    okuma sırasında değişmiş sayaç görürse tekrar dener. name None ise
+    yeni bölüm oluşturulur, verilirse var olana bağlanılır.
+    """
+    def __init__(self, name=None, buckets=40):
+        histogram = buckets + 1
+        size = len(CONTROL_FIELDS) + len(METER_FIELDS) + 2 * histogram
+        self.memory = shared_memory.SharedMemory(name=name, create=name is None, size=size * 8)
+        self.name = self.memory.name
+        self.array = np.ndarray((size,), dtype=np.float64, buffer=self.memory.buf)
+        if name is None:
+            self.array.fill(0)
+        end = len(CONTROL_FIELDS)
+        self.control = self.array[:end]
+        self.meter = self.array[end:end + len(METER_FIELDS)]
+        end += len(METER_FIELDS)
+        self.load_histogram = self.array[end:end + histogram]
+        self.jitter_histogram = self.array[end + histogram:end + 2 * histogram]
+
+    def send(self, **changes):
+        """Denetleyici: ayarları yaz ve motora yeni sürüm olduğunu bildir"""
+        for name, value in changes.items():
+            self.control[CONTROL[name]] = value
+        self.control[CONTROL['version']] += 1
+
+    def receive(self, version):
+        """Motor: version'dan sonra yeni ayar varsa (sürüm, ayarlar) döndür, yoksa None"""
+        current = self.control[CONTROL['version']]
+        if current == version:
+            return None
+        values = self.control.copy()
+        return current, dict(zip(CONTROL_FIELDS, values.tolist()))
+
+    def store_monitor(self, monitor, **fields):
+        """Motor: callback sayaçlarını ve durum alanlarını ölçüm bölümüne kopyala"""
+        meter = self.meter
+        meter[METER['sequence']] += 1
+        for name, value in fields.items():
+            meter[METER[name]] = value
+        meter[METER['period']] = monitor.period
+        meter[METER['callbacks']] = monitor.callbacks
+        meter[METER['max_duration']] = monitor.max_duration
+        meter[METER['max_jitter']] = monitor.max_jitter
+        for flag, count in zip(XRUN_FLAGS, monitor.xruns):
+            meter[METER[flag]] = count
+        self.load_histogram[:] = monitor.load_histogram
+        self.jitter_histogram[:] = monitor.jitter_histogram
+        meter[METER['sequence']] += 1
+
+    def load_monitor(self, monitor, retries=100):
+        """Denetleyici: ölçüm bölümünü tutarlı olarak monitor'a kopyala, durum alanlarını döndür"""
+        for _ in range(retries):
+            sequence = self.meter[METER['sequence']]
+            if sequence % 2:
+                time.sleep(0)
+                continue
+            meter = self.meter.copy()
+            load = self.load_histogram.copy()
+            jitter = self.jitter_histogram.copy()
+            if self.meter[METER['sequence']] == sequence:
+                break
+        else:
+            return None
+        values = dict(zip(METER_FIELDS, meter.tolist()))
+        if values['period']:
+            monitor.period = values['period']
+            monitor.bucket_width = monitor.period * monitor.bucket_percent / 100
+        monitor.callbacks = int(values['callbacks'])
+        monitor.max_duration = values['max_duration']
+        monitor.max_jitter = values['max_jitter']
+        monitor.xruns[:] = [int(values[flag]) for flag in XRUN_FLAGS]
+        monitor.load_histogram[:] = load.astype(int).tolist()
+        monitor.jitter_histogram[:] = jitter.astype(int).tolist()
+        return values
+
+    def close(self):
+        self.control = self.meter = self.load_histogram = self.jitter_histogram = None
+        self.array = None
+        self.memory.close()
+
+    def unlink(self):
+        self.memory.unlink()
+
+
+def request_realtime(priority=70):
+    """Süreci SCHED_FIFO'ya al, hata metnini ya da None döndür
+
+    Akıştan önce çağrılır; sonradan açılan thread'ler (PortAudio'nun
+    callback thread'i dahil) politikayı miras alır.
+    """
+    if not hasattr(os, 'sched_setscheduler'):
+        return "SCHED_FIFO bu sistemde yok"
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+    except OSError as e:
+        return f"SCHED_FIFO alınamadı: {e.strerror}"
+    return None
+
+
+def lock_memory():
+    """Sürecin sayfalarını RAM'de kilitle (mlockall), hata metnini ya da None döndür
+
+    Tamponlar ayrıldıktan sonra çağrılır. RLIMIT_MEMLOCK sınırsız değilse
+    sadece mevcut sayfalar kilitlenir (MCL_CURRENT); MCL_FUTURE sınıra
+    takılınca sonraki her bellek ayırma başarısız olurdu.
+    """
+    if not sys.platform.startswith('linux'):
+        return "mlockall bu sistemde yok"
+    import resource
+    flags = MCL_CURRENT
+    if resource.getrlimit(resource.RLIMIT_MEMLOCK)[0] == resource.RLIM_INFINITY:
+        flags |= MCL_FUTURE
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.mlockall(flags) != 0:
+        return f"mlockall başarısız: {os.strerror(ctypes.get_errno())}"
+    return None
+
+
+def load_module(filename):
+    """Dosya adında boşluk olan betiği modül olarak yükle"""
+    name = os.path.splitext(filename)[0].replace(' ', '_')
+    spec = importlib.util.spec_from_file_location(name, os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def apply_control(jammer, control):
+    """Paylaşılan bellekten gelen ayarları motordaki SpeechJammer'a uygula"""
+    if control['delay'] != jammer.delay:
+        jammer.set_delay(control['delay'])
+    if control['gain'] != jammer.feedback_gain:
+        jammer.set_gain(control['gain'])
+    if bool(control['modulate']) != jammer.modulate:
+        jammer.set_modulation(bool(control['modulate']))
+    if bool(control['faf']) != jammer.faf:
+        jammer.set_faf(bool(control['faf']))
+    if bool(control['voice_gate']) != jammer.voice_gate:
+        jammer.set_voice_gate(bool(control['voice_gate']))
+    if control['running']:
+        jammer.start()
+    else:
+        jammer.stop()
+
+
+def run_engine(name, settings, arm=None):
+    """Motor sürecinin giriş noktası
+
+    SpeechJammer'ı kurar, akışı açar ve interval aralıkla kontrol
+    bölümündeki değişiklikleri uygulayıp sayaçları ölçüm bölümüne yazar.
+    Bu döngü dışında süreçte Python kodu çalışmaz. arm verilirse akış
+    sounddevice yerine onunla açılır (ölçüm aracı için).
+    """
+    shared = SharedState(name)
+    realtime = locked = NOT_REQUESTED
+    if settings.get('realtime'):
+        problem = request_realtime(settings.get('priority', 70))
+        realtime = DENIED if problem else GRANTED
+        if problem:
+            print(f"⚠️ {problem}")
+
+    module = load_module(settings.get('script', 'deneme copy.py'))
+    output_device = settings.get('output_device')
+    if output_device is None and arm is None:
+        output_device = module.find_bluetooth_device()
+    jammer = module.SpeechJammer(
+        delay=settings.get('delay', 0.18),
+        feedback_gain=settings.get('gain', 0.8),
+        output_device=output_device
+    )
+    armed = arm(jammer) if arm is not None else jammer.arm()
+    if armed and settings.get('lock_memory'):
+        problem = lock_memory()
+        locked = DENIED if problem else GRANTED
+        if problem:
+            print(f"⚠️ {problem}")
+
+    state = ARMED if armed else FAILED
+    interval = settings.get('interval', 0.02)
+    version = 0
+    try:
+        while True:
+            update = shared.receive(version)
+            if update is not None:
+                version, control = update
+                if control['quit']:
+                    break
+                if armed:
+                    apply_control(jammer, control)
+            shared.store_monitor(jammer.monitor, state=state, realtime=realtime, locked=locked)
+            time.sleep(interval)
+    finally:
+        jammer.disarm()
+        shared.store_monitor(jammer.monitor, state=STOPPED, realtime=realtime, locked=locked)
+        shared.close()
+
+
+class EngineProcess:
+    """Denetleyici tarafı: motoru ayrı süreçte başlat ve paylaşılan bellekle yönet
+
+    SpeechJammer'ın kontrol metodlarını taklit eder, böylece ana döngü
+    aynı kalır. snapshot() motorun callback sayaçlarını CallbackMonitor
+    ile aynı biçimde döndürür ve MonitorReporter'a doğrudan verilebilir.
+    """
+    def __init__(self, delay=0.18, feedback_gain=0.8, output_device=None, script='deneme copy.py',
+                 realtime=False, priority=70, lock=False, arm=None):
+        self.delay = delay
+        self.feedback_gain = feedback_gain
+        self.modulate = False
+        self.faf = False
+        self.voice_gate = True
+        self.running = False
+        self.max_delay = 0.5
+        self.settings = {
+            'script': script,
+            'output_device': output_device,
+            'delay': delay,
+            'gain': feedback_gain,
+            'realtime': realtime,
+            'priority': priority,
+            'lock_memory': lock,
+        }
+        self.arm = arm
+        self.shared = None
+        self.process = None
+        self.monitor = CallbackMonitor()  # Motorun sayaçlarının bu süreçteki kopyası
+        self.state = {}
+
+    def launch(self, timeout=10.0):
+        """Motor sürecini başlat, akış açılana kadar bekle"""
+        self.shared = SharedState(buckets=self.monitor.buckets)
+        self.send()
+        # fork yerine spawn: PortAudio sadece motor sürecinde yüklenir
+        context = multiprocessing.get_context('spawn')
+        self.process = context.Process(
+            target=run_engine, args=(self.shared.name, self.settings, self.arm), daemon=True
+        )
+        self.process.start()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and self.process.is_alive():
+            self.snapshot()
+            if self.state.get('state', STARTING) != STARTING:
+                break
+            time.sleep(0.05)
+        return self.state.get('state') == ARMED
+
+    def send(self, **changes):
+        self.shared.send(
+            running=self.running,
+            delay=self.delay,
+            gain=self.feedback_gain,
+            modulate=self.modulate,
+            faf=self.faf,
+            voice_gate=self.voice_gate,
+            **changes
+        )
+
+    def start(self):
+        if self.state.get('state') != ARMED:
+            return False
+        self.running = True
+        self.send()
+        return True
+
+    def stop(self):
+        self.running = False
+        self.send()
+
+    def set_delay(self, delay):
+        self.delay = min(self.max_delay, max(0.0, delay))
+        self.send()
+
+    def set_gain(self, gain):
+        self.feedback_gain = gain
+        self.send()
+
+    def set_modulation(self, enabled):
+        self.modulate = enabled
+        self.send()
+
+    def set_faf(self, enabled):
+        self.faf = enabled
+        self.send()
+
+    def set_voice_gate(self, enabled):
+        self.voice_gate = enabled
+        self.send()
+
+    def snapshot(self):
+        """Motorun sayaçlarını oku, CallbackMonitor.snapshot() biçiminde döndür"""
+        state = self.shared.load_monitor(self.monitor)
+        if state is not None:
+            self.state = state
+        return self.monitor.snapshot()
+
+    def close(self, timeout=2.0):
+        """Motoru durdur, gerekirse sonlandır ve paylaşılan belleği bırak"""
+        if self.process is not None:
+            self.send(quit=1)
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+            self.process = None
+        if self.shared is not None:
+            self.shared.close()
+            self.shared.unlink()
+            self.shared = None
+
+
+def priority_text(state):
+    """Motorun SCHED_FIFO / mlockall durumu"""
+    marks = {GRANTED: "✅", DENIED: "❌"}
+    parts = [f"{label} {marks[state.get(key)]}" for key, label in (('realtime', 'FIFO'), ('locked', 'mlock'))
+             if state.get(key) in marks]
+    return f" - {' '.join(parts)}" if parts else ""
+
+
+def engine_indicator(engine, snapshot):
+    """Motor sürecinin sağlığı, denetleyici sürecinde yazdırılır"""
+    if engine.running:
+        print(f"🔴 {health_text(snapshot)} - jitter max: %{snapshot['jitter_max']:.0f}{priority_text(engine.state)}", end="\r")
+    else:
+        print("⚪", end="\r")
+
+
+# Tuş -> (eylem, basılı tutunca tekrar etsin mi)
+KEY_BINDINGS = {
+    'space': ('toggle', False),
+    'up': ('delay_up', True),
+    'down': ('delay_down', True),
+    'right': ('gain_up', True),
+    'left': ('gain_down', True),
+    'm': ('modulate', False),
+    'f': ('faf', False),
+    'v': ('voice_gate', False),
+    'esc': ('quit', False),
+    'q': ('quit', False),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Speech Jammer, ses motoru ayrı süreçte")
+    parser.add_argument('--script', default='deneme copy.py', help="SpeechJammer sınıfını içeren betik")
+    parser.add_argument('--delay', type=float, default=0.18)
+    parser.add_argument('--gain', type=float, default=0.9)
+    parser.add_argument('--realtime', action='store_true', help="motor için SCHED_FIFO iste")
+    parser.add_argument('--priority', type=int, default=70, help="SCHED_FIFO önceliği (1-99)")
+    parser.add_argument('--lock-memory', action='store_true', help="motorun belleğini kilitle (mlockall)")
+    args = parser.parse_args(argv)
+
+    from controls import KeyControls
+
+    print("🎤 Speech Jammer - Ayrı Süreçte Motor")
+    print("=" * 40)
+    engine = EngineProcess(delay=args.delay, feedback_gain=args.gain, script=args.script,
+                           realtime=args.realtime, priority=args.priority, lock=args.lock_memory)
+    if not engine.launch():
+        print("❌ Motor başlatılamadı!")
+        engine.close()
+        return 1
+
+    reporter = MonitorReporter(engine, lambda snapshot: engine_indicator(engine, snapshot))
+    reporter.start()
+
+    print("\n🎮 Kontroller:")
+    print("SPACE = Başlat/Durdur")
+    print("↑/↓ = Gecikmeyi artır/azalt (+/- 10ms)")
+    print("→/← = Ses şiddetini artır/azalt")
+    print("M = Sürekli rastgele gecikme aç/kapa")
+    print("F = Frekans kaydırma (FAF) aç/kapa")
+    print("V = Sessizlikte tasarruf modu aç/kapa")
+    print("ESC veya Q = Çıkış\n")
+
+    controls = KeyControls(KEY_BINDINGS)
+    controls.start()
+
+    try:
+        while True:
+            action = controls.get()
+
+            if action == 'toggle':
+                if engine.running:
+                    engine.stop()
+                    print("⏹️  Durduruldu")
+                elif engine.start():
+                    print(f"▶️  Başlatıldı - Gecikme: {engine.delay*1000:.0f}ms")
+                else:
+                    print("❌ Başlatılamadı!")
+
+            elif action == 'delay_up':
+                engine.set_delay(min(0.5, engine.delay + 0.01))
+                print(f"⏰ Gecikme: {engine.delay*1000:.0f}ms")
+
+            elif action == 'delay_down':
+                engine.set_delay(max(0.05, engine.delay - 0.01))
+                print(f"⏰ Gecikme: {engine.delay*1000:.0f}ms")
+
+            elif action == 'gain_up':
+                engine.set_gain(min(1.0, engine.feedback_gain + 0.1))
+                print(f"🔊 Ses şiddeti: %{engine.feedback_gain*100:.0f}")
+
+            elif action == 'gain_down':
+                engine.set_gain(max(0.1, engine.feedback_gain - 0.1))
+                print(f"🔊 Ses şiddeti: %{engine.feedback_gain*100:.0f}")
+
+            elif action == 'modulate':
+                engine.set_modulation(not engine.modulate)
+                print(f"🌊 Sürekli rastgele gecikme: {'açık' if engine.modulate else 'kapalı'}")
+
+            elif action == 'faf':
+                engine.set_faf(not engine.faf)
+                print(f"🎵 FAF: {'açık' if engine.faf else 'kapalı'}")
+
+            elif action == 'voice_gate':
+                engine.set_voice_gate(not engine.voice_gate)
+                print(f"🔋 Sessizlikte tasarruf: {'açık' if engine.voice_gate else 'kapalı'}")
+
+            elif action == 'quit':
+                print("\n👋 Program sonlandırılıyor...")
+                break
+
+    except KeyboardInterrupt:
+        print("\n👋 Program sonlandırılıyor...")
+    finally:
+        reporter.stop()
+        controls.stop()
+        engine.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+import numpy as np
+
+class GainRamp:
+    """Çıkış şiddetini bir blok boyunca doğrusal rampayla hedefe taşı
+
+    Hedef değiştiğinde şiddet tek blokta yumuşakça değişir, tık sesi olmaz.
+    Rampa dizileri bir kez ayrılır, apply() yeni dizi oluşturmaz.
+    """
+    def __init__(self, blocksize, dtype='float32', gain=0.0):
+        self.gain = gain
+        self.steps = np.arange(1, blocksize + 1, dtype=dtype)[:, np.newaxis]
+        self.gains = np.zeros((blocksize, 1), dtype=dtype)
+
+    def apply(self, block, target):
+        """block'u yerinde şiddetle çarp, şiddet bu blokta target'a ulaşır"""
+        if target == self.gain:
+            np.multiply(block, target, out=block)
+            return
+        # Rampa bloğun gerçek uzunluğuna yayılır, kısa bloklarda da hedefe varılır
+        frames = len(block)
+        gains = self.gains[:frames]
+        np.multiply(self.steps[:frames], (target - self.gain) / frames, out=gains)
+        gains += self.gain
+        np.multiply(block, gains, out=block)
+        self.gain = target
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+
+XRUN_FLAGS = ('input_underflow', 'input_overflow', 'output_underflow', 'output_overflow')
+
+
+class CallbackMonitor:
+    """Callback sağlığını önceden ayrılmış sayaç ve histogramlarda tut
+
+    Sadece ses thread'leri yazar, okuyucu thread snapshot() ile kopyalar;
+    kilit kullanılmaz. Ayrı giriş akışı sadece flags() ile xrun bayraklarını
+    ekler, süre ve jitter çıkış callback'inden ölçülür. Callback içindeki
+    hatalar error() ile sayılır, mesaj okuyucu thread'de yazdırılır.
+    Süre ve jitter histogramlarının kutuları blok süresinin bucket_percent
+    yüzdesi genişliğindedir, son kutu taşma kutusudur.
+    """
+    def __init__(self, sample_rate=44100, blocksize=256, buckets=40, bucket_percent=5.0):
+        self.buckets = buckets
+        self.bucket_percent = bucket_percent
+        self.xruns = [0] * len(XRUN_FLAGS)
+        self.load_histogram = [0] * (buckets + 1)
+        self.jitter_histogram = [0] * (buckets + 1)
+        self.reset(sample_rate, blocksize)
+
+    def reset(self, sample_rate, blocksize):
+        """Akış açılmadan önce blok süresine göre sıfırla"""
+        self.period = blocksize / sample_rate
+        self.bucket_width = self.period * self.bucket_percent / 100
+        for counters in (self.xruns, self.load_histogram, self.jitter_histogram):
+            counters[:] = [0] * len(counters)
+        self.callbacks = 0
+        self.max_duration = 0.0
+        self.max_jitter = 0.0
+        self.last_start = 0.0
+        self.errors = 0
+        self.last_error = None
+
+    def begin(self, status):
+        """Callback başında çağır: xrun bayraklarını ve jitter'ı kaydet"""
+        start = time.perf_counter()
+        if self.last_start:
+            jitter = abs(start - self.last_start - self.period)
+            self.jitter_histogram[min(int(jitter / self.bucket_width), self.buckets)] += 1
+            if jitter > self.max_jitter:
+                self.max_jitter = jitter
+        self.last_start = start
+        self.flags(status)
+        return start
+
+    def flags(self, status):
+        """Sadece xrun bayraklarını say (süresi ölçülmeyen ayrı giriş akışı için)"""
+        if status:
+            for index, flag in enumerate(XRUN_FLAGS):
+                if getattr(status, flag, False):
+                    self.xruns[index] += 1
+
+    def end(self, start):
+        """Callback sonunda çağır: süreyi histograma ekle"""
+        duration = time.perf_counter() - start
+        self.load_histogram[min(int(duration / self.bucket_width), self.buckets)] += 1
+        if duration > self.max_duration:
+            self.max_duration = duration
+        self.callbacks += 1
+
+    def error(self, exception):
+        """Callback içindeki hatayı kaydet, print okuyucu thread'e kalır"""
+        self.last_error = exception
+        self.errors += 1
+
+    def _percentile(self, histogram, fraction):
+        """Histogramdan yüzdelik değeri kutunun üst sınırı olarak bul (blok süresinin %'si)"""
+        total = sum(histogram)
+        if total == 0:
+            return 0.0
+        needed = fraction * total
+        seen = 0
+        for index, count in enumerate(histogram):
+            seen += count
+            if seen >= needed:
+                return (index + 1) * self.bucket_percent
+        return (self.buckets + 1) * self.bucket_percent
+
+    def snapshot(self):
+        """Sayaçların kopyasını ve özetini döndür (ses thread'i dışında çağrılır)"""
+        load = list(self.load_histogram)
+        jitter = list(self.jitter_histogram)
+        xruns = dict(zip(XRUN_FLAGS, self.xruns))
+        return {
+            'callbacks': self.callbacks,
+            'xruns': xruns,
+            'xrun_total': sum(xruns.values()),
+            'load_p50': self._percentile(load, 0.5),
+            'load_p99': self._percentile(load, 0.99),
+            'load_max': self.max_duration / self.period * 100,
+            'jitter_p99': self._percentile(jitter, 0.99),
+            'jitter_max': self.max_jitter / self.period * 100,
+            'errors': self.errors,
+            'last_error': self.last_error,
+            'load_histogram': load,
+            'jitter_histogram': jitter,
+        }
+
+
+class MonitorReporter(threading.Thread):
+    """Gerçek zamanlı olmayan thread: sayaçları belirli aralıkla okuyup yayınla"""
+    def __init__(self, monitor, publish, interval=0.5):
+        super().__init__(daemon=True)
+        self.monitor = monitor
+        self.publish = publish
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.publish(self.monitor.snapshot())
+
+    def stop(self):
+        self.stopped.set()
+
+
+def health_text(snapshot):
+    """Konsolda gösterilecek kısa sağlık özeti"""
+    return (f"xrun: {snapshot['xrun_total']} - "
+            f"yük p99: %{snapshot['load_p99']:.0f} - "
+            f"jitter p99: %{snapshot['jitter_p99']:.0f}")
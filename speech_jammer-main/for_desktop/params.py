@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+from typing import NamedTuple
+
+class Params(NamedTuple):
+    """Ses thread'inin bir blok boyunca kullandığı değişmez parametreler"""
+    gain: float = 0.0  # Uygulanacak şiddet, durdurulmuşken 0
+    dry: float = 0.0  # Gecikmesiz sesin karışım oranı
+    delay_frames: int = 0  # Gecikme hattının uzunluğu (örnek)
+
+
+class ParamStore:
+    """UI'dan ses thread'ine kilitsiz parametre aktarımı
+
+    UI thread'i publish() ile eski görüntüden yeni bir Params üretir ve tek
+    referans atamasıyla yayınlar. Ses thread'i blok başında current'i bir
+    kez okur ve blok boyunca sadece o görüntüyü kullanır; görüntüler
+    değişmez olduğu için ilgili değerler hep birlikte, yarım güncelleme
+    olmadan görülür. Tek yazar (UI thread'i) varsayılır.
+    """
+    def __init__(self, **values):
+        self.current = Params(**values)
+
+    def publish(self, **changes):
+        snapshot = self.current._replace(**changes)
+        self.current = snapshot
+        return snapshot
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import numpy as np
+
+class PitchShifter:
+    """Faz vokoderi ile frekansı değiştirilmiş geri besleme (FAF)
+
+    Giriş fft_size uzunluğunda, hop = fft_size / oversampling aralıklı
+    pencerelere bölünür. Her pencere numpy.fft ile dönüştürülür, frekans
+    kutuları semitones kadar kaydırılır ve örtüşerek toplanır (overlap-add).
+    Pencere, kutu indeksleri ve faz sabitleri bir kez hesaplanır; tüm
+    kanallar aynı rfft çağrısında işlenir. Eklenen gecikme fft_size örnektir.
+    """
+    def __init__(self, semitones, fft_size=1024, channels=2, oversampling=4, dtype=np.float32):
+        self.semitones = semitones
+        self.fft_size = fft_size
+        self.hop = fft_size // oversampling
+        self.overlap = fft_size - self.hop
+        self.latency = fft_size  # Sese eklenen gecikme (örnek)
+        self.oversampling = oversampling
+        self.factor = 2.0 ** (semitones / 12.0)
+        bins = fft_size // 2 + 1
+
+        # Periyodik Hann penceresi, analiz ve sentezde iki kez uygulanır
+        self.window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(fft_size) / fft_size))[:, np.newaxis]
+        self.scale = self.hop / np.sum(self.window ** 2)
+
+        # Kutu başına beklenen faz ilerlemesi ve kaydırma haritası
+        bin_index = np.arange(bins)
+        self.expected_phase = (2 * np.pi * self.hop / fft_size * bin_index)[:, np.newaxis]
+        self.bin_index = bin_index[:, np.newaxis].astype(np.float64)
+        target = np.floor(bin_index * self.factor).astype(np.intp)
+        self.source = bin_index[target < bins]
+        self.target = target[target < bins]
+        # Hedefler tekrarsızsa doğrudan atama, değilse toplama gerekir
+        self.unique_targets = len(np.unique(self.target)) == len(self.target)
+
+        self.in_fifo = np.zeros((fft_size, channels), dtype=dtype)
+        self.out_fifo = np.zeros((self.hop, channels), dtype=dtype)
+        self.accumulator = np.zeros((fft_size + self.hop, channels))
+        self.last_phase = np.zeros((bins, channels))
+        self.sum_phase = np.zeros((bins, channels))
+        self.synth_magnitude = np.zeros((bins, channels))
+        self.synth_frequency = np.zeros((bins, channels))
+        self.rover = self.overlap
+
+    def process(self, block, out):
+        """block'u işle, sonucu out'a yaz (block ile out aynı dizi olabilir)"""
+        frames = len(block)
+        position = 0
+        while position < frames:
+            count = min(frames - position, self.fft_size - self.rover)
+            end = position + count
+            self.in_fifo[self.rover:self.rover + count] = block[position:end]
+            read = self.rover - self.overlap
+            out[position:end] = self.out_fifo[read:read + count]
+            self.rover += count
+            position = end
+            if self.rover >= self.fft_size:
+                self.rover = self.overlap
+                self._frame()
+
+    def _frame(self):
+        """Tek bir pencereyi analiz et, kaydır ve çıkış birikimine ekle"""
+        spectrum = np.fft.rfft(self.in_fifo * self.window, axis=0)
+        magnitude = np.abs(spectrum)
+        phase = np.angle(spectrum)
+
+        # Gerçek frekans: faz farkından beklenen ilerlemeyi çıkar, [-pi, pi]'ye sar
+        delta = phase - self.last_phase
+        self.last_phase = phase
+        delta -= self.expected_phase
+        delta = np.mod(delta + np.pi, 2 * np.pi) - np.pi
+        frequency = self.bin_index + delta * (self.oversampling / (2 * np.pi))
+
+        # Kutuları factor kadar kaydır
+        self.synth_magnitude.fill(0)
+        self.synth_frequency.fill(0)
+        if self.unique_targets:
+            self.synth_magnitude[self.target] = magnitude[self.source]
+        else:
+            np.add.at(self.synth_magnitude, self.target, magnitude[self.source])
+        self.synth_frequency[self.target] = frequency[self.source] * self.factor
+
+        # Faz biriktirerek sentezle
+        delta = (self.synth_frequency - self.bin_index) * (2 * np.pi / self.oversampling)
+        self.sum_phase += delta + self.expected_phase
+        frame = np.fft.irfft(self.synth_magnitude * np.exp(1j * self.sum_phase), n=self.fft_size, axis=0)
+
+        self.accumulator[:self.fft_size] += frame * self.window * self.scale
+        self.out_fifo[:] = self.accumulator[:self.hop]
+        self.accumulator[:-self.hop] = self.accumulator[self.hop:]
+        self.accumulator[-self.hop:] = 0
+        self.in_fifo[:self.overlap] = self.in_fifo[self.hop:]
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+import time
+import wave
+import numpy as np
+from stream_link import SampleRing
+
+class WavSink:
+    """16 bit PCM WAV, sadece standart kütüphane"""
+    def __init__(self, path, sample_rate, channels):
+        self.file = wave.open(path, 'wb')
+        self.file.setnchannels(channels)
+        self.file.setsampwidth(2)
+        self.file.setframerate(int(sample_rate))
+
+    def write(self, block):
+        pcm = np.clip(block, -1.0, 1.0) * 32767
+        self.file.writeframes(pcm.astype('<i2').tobytes())
+
+    def close(self):
+        self.file.close()
+
+
+class FlacSink:
+    """FLAC, soundfile modülü gerekir"""
+    def __init__(self, path, sample_rate, channels):
+        import soundfile  # pip install soundfile
+        self.file = soundfile.SoundFile(path, 'w', int(sample_rate), channels, format='FLAC')
+
+    def write(self, block):
+        self.file.write(block)
+
+    def close(self):
+        self.file.close()
+
+
+class RawSink:
+    """Bellek eşlemli ham float32 dosya (iç içe kanallar)
+
+    Dosya grow_seconds'lık parçalarla büyütülür, kapatılınca yazılan
+    uzunluğa kısaltılır.
+    """
+    def __init__(self, path, sample_rate, channels, grow_seconds=60):
+        self.path = path
+        self.channels = channels
+        self.grow = int(grow_seconds * sample_rate)
+        self.frames = 0
+        self.map = None
+        open(path, 'wb').close()
+        self.resize(self.grow)
+
+    def resize(self, frames):
+        if self.map is not None:
+            self.map.flush()
+            self.map = None
+        os.truncate(self.path, frames * self.channels * 4)
+        self.map = np.memmap(self.path, dtype=np.float32, mode='r+', shape=(frames, self.channels))
+
+    def write(self, block):
+        end = self.frames + len(block)
+        if end > len(self.map):
+            self.resize(end + self.grow)
+        self.map[self.frames:end] = block
+        self.frames = end
+
+    def close(self):
+        self.map.flush()
+        self.map = None
+        os.truncate(self.path, self.frames * self.channels * 4)
+
+
+SINKS = {'.wav': WavSink, '.flac': FlacSink, '.raw': RawSink, '.f32': RawSink}
+
+
+class SessionRecorder:
+    """Ses thread'ini bekletmeden mikrofon ve çıkışı dosyaya kaydet
+
+    Callback her bloğu önceden ayrılmış tek yazar / tek okuyuculu halkaya
+    kopyalar (önce record_input, sonra record_output; kanallar yan yana).
+    Yazıcı thread halkayı büyük parçalar halinde dosyaya boşaltır. Halka
+    dolarsa blok atılır ve dropped() artar; disk takılsa bile callback
+    hiç beklemez. Dosya türü uzantıdan seçilir: .wav, .flac, .raw/.f32.
+    """
+    def __init__(self, path, sample_rate, input_channels, output_channels, max_block=4096,
+                 buffer_seconds=10.0, chunk_seconds=0.25, dtype=np.float32):
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in SINKS:
+            raise ValueError(f"Desteklenmeyen kayıt türü: {extension} ({', '.join(SINKS)})")
+        self.path = path
+        self.sink_type = SINKS[extension]
+        self.sample_rate = sample_rate
+        self.input_channels = input_channels
+        self.channels = input_channels + output_channels
+        self.chunk_seconds = chunk_seconds
+        self.ring = SampleRing(int(buffer_seconds * sample_rate), self.channels, max_block=1, dtype=dtype)
+        self.block = np.zeros((max_block, self.channels), dtype=dtype)
+        self.sink = None
+        self.thread = None
+        self.running = False
+        self.frames_written = 0
+        self.longest_write = 0.0  # En uzun tek disk yazması (saniye)
+
+    def record_input(self, block):
+        """Ses thread'i: mikrofon bloğunu ilk kanallara kopyala"""
+        self.block[:len(block), :self.input_channels] = block
+
+    def record_output(self, block):
+        """Ses thread'i: çıkış bloğunu ekle ve bloğu halkaya yaz (yer yoksa atılır)"""
+        frames = len(block)
+        self.block[:frames, self.input_channels:] = block
+        self.ring.write(self.block[:frames])
+
+    def start(self):
+        # Dosya ana thread'de açılır, hata varsa hemen görülür
+        self.sink = self.sink_type(self.path, self.sample_rate, self.channels)
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while self.running:
+            self.drain()
+            time.sleep(self.chunk_seconds)
+        self.drain()
+        self.sink.close()
+
+    def drain(self):
+        """Halkada biriken her şeyi dosyaya yaz"""
+        first, second = self.ring.readable()
+        count = len(first) + len(second)
+        if not count:
+            return
+        start = time.perf_counter()
+        for part in (first, second):
+            if len(part):
+                self.sink.write(part)
+        self.longest_write = max(self.longest_write, time.perf_counter() - start)
+        self.ring.skip(count)
+        self.frames_written += count
+
+    def stop(self):
+        """Kalanları yaz ve dosyayı kapat"""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def dropped(self):
+        return self.ring.dropped
+
+    def seconds(self):
+        return self.frames_written / self.sample_rate
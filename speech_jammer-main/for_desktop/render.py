@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""Ses dosyalarının gecikmeli (DAF/FAF) sürümlerini çevrimdışı üret
+
+Canlı callback'in kullandığı çekirdek (PitchShifter -> DelayLine ->
+şiddet ve sınırlayıcı) dosyaya parça parça uygulanır, dosya hiçbir zaman tamamen
+belleğe alınmaz. WAV dosyaları belleğe eşlenerek okunur; MP3, FLAC ve
+diğer türler soundfile ile parça parça çözülür. Birden fazla dosya
+ProcessPoolExecutor ile çekirdeklere dağıtılır. Sonuç 16 bit WAV olarak
+yazılır ve gecikmeli sesin sonu kesilmesin diye gecikme kadar uzar.
+
+Kullanım:
+    python3 render.py kayit.wav
+    python3 render.py *.wav *.mp3 --delay 0.2 --gain 0.9 --faf 3 --out-dir rendered --jobs 4
+"""
+
+import argparse
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from delay_line import DelayLine
+from dsp_chain import output_chain
+from params import ParamStore
+from pitch_shift import PitchShifter
+from recorder import WavSink
+
+CHUNK = 16384  # Parça başına örnek
+
+# WAV biçim etiketi ve bit sayısı -> (numpy tipi, ölçek, sıfır noktası)
+WAV_FORMATS = {
+    (1, 8): ('u1', 1 / 128, 128),
+    (1, 16): ('<i2', 1 / 32768, 0),
+    (1, 32): ('<i4', 1 / 2147483648, 0),
+    (3, 32): ('<f4', 1.0, 0),
+    (3, 64): ('<f8', 1.0, 0),
+}
+
+
+class WavReader:
+    """WAV'ın veri bölümünü belleğe eşle, parçaları float32'ye çevirerek ver"""
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            riff, _, wave_id = struct.unpack('<4sI4s', f.read(12))
+            if riff != b'RIFF' or wave_id != b'WAVE':
+                raise ValueError(f"WAV dosyası değil: {path}")
+            fmt = None
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    raise ValueError(f"WAV veri bölümü yok: {path}")
+                chunk_id, size = struct.unpack('<4sI', header)
+                if chunk_id == b'data':
+                    offset = f.tell()
+                    break
+                body = f.read(size + (size & 1))
+                if chunk_id == b'fmt ':
+                    fmt = struct.unpack('<HHIIHH', body[:16])
+                    if fmt[0] == 0xFFFE:  # WAVE_FORMAT_EXTENSIBLE, asıl etiket alt biçimde
+                        fmt = (struct.unpack('<H', body[24:26])[0],) + fmt[1:]
+        if fmt is None:
+            raise ValueError(f"WAV biçim bölümü yok: {path}")
+        tag, self.channels, self.sample_rate, _, block_align, bits = fmt
+        # Canlı kaydedilen dosyalarda veri boyu eksik/yanlış olabilir
+        self.frames = min(size, os.path.getsize(path) - offset) // block_align
+        if (tag, bits) == (1, 24):
+            self.data = np.memmap(path, 'u1', 'r', offset, (self.frames, self.channels, 3))
+            self.convert = self._convert_24
+        elif (tag, bits) in WAV_FORMATS:
+            dtype, self.scale, self.zero = WAV_FORMATS[tag, bits]
+            self.data = np.memmap(path, dtype, 'r', offset, (self.frames, self.channels))
+            self.convert = self._convert
+        else:
+            raise ValueError(f"Desteklenmeyen WAV biçimi: etiket {tag}, {bits} bit")
+
+    def _convert(self, raw, out):
+        # Önce float32'ye: 8 bitte sıfır noktası u1 üzerinde çıkarılırsa taşar
+        np.copyto(out, raw, casting='unsafe')
+        if self.zero:
+            out -= self.zero
+        out *= self.scale
+
+    def _convert_24(self, raw, out):
+        # Üç bayt üst sekiz bite yerleştirilir, işaret int32'den gelir
+        whole = (raw[..., 0].astype(np.int32) << 8) | (raw[..., 1].astype(np.int32) << 16) | (raw[..., 2].astype(np.int32) << 24)
+        np.multiply(whole, 1 / 2147483648, out=out, casting='unsafe')
+
+    def chunks(self, size):
+        buffer = np.zeros((size, self.channels), dtype=np.float32)
+        for start in range(0, self.frames, size):
+            raw = self.data[start:start + size]
+            out = buffer[:len(raw)]
+            self.convert(raw, out)
+            yield out
+
+    def close(self):
+        self.data = None
+
+
+class SoundFileReader:
+    """MP3, FLAC, OGG vb. dosyaları soundfile ile parça parça çöz"""
+    def __init__(self, path):
+        import soundfile  # pip install soundfile
+        self.file = soundfile.SoundFile(path)
+        self.channels = self.file.channels
+        self.sample_rate = self.file.samplerate
+        self.frames = self.file.frames
+
+    def chunks(self, size):
+        buffer = np.zeros((size, self.channels), dtype=np.float32)
+        while True:
+            block = self.file.read(size, dtype='float32', out=buffer)
+            if not len(block):
+                return
+            yield block
+
+    def close(self):
+        self.file.close()
+
+
+def open_audio(path):
+    if os.path.splitext(path)[1].lower() in ('.wav', '.wave'):
+        return WavReader(path)
+    return SoundFileReader(path)
+
+
+class Renderer:
+    """Canlı callback'in sırasıyla FAF, gecikme ve şiddet uygula"""
+    def __init__(self, sample_rate, channels, delay=0.18, gain=0.8, faf_semitones=None,
+                 fft_size=1024, chunk=CHUNK, dtype=np.float32):
+        length = int(delay * sample_rate)
+        self.params = ParamStore(gain=gain).current
+        self.output_chain = output_chain(sample_rate, initial=gain).build(chunk, channels, dtype)
+        self.delay_line = DelayLine(max(0, length - self.output_chain.latency), channels, dtype=dtype, max_block=chunk)
+        self.pitch_shifter = None
+        if faf_semitones is not None:
+            self.pitch_shifter = PitchShifter(faf_semitones, fft_size, channels=channels, dtype=dtype)
+        # Girişin sonundan sonra gecikmeli sesin tamamı çıkana kadar sessizlik beslenir
+        self.tail = length + (self.pitch_shifter.latency if self.pitch_shifter else 0)
+        self.out = np.zeros((chunk, channels), dtype=dtype)
+        self.silence = np.zeros((chunk, channels), dtype=dtype)
+
+    def process(self, block):
+        """block'u işle (yerinde değişebilir), çıkış tamponunun dilimini döndür"""
+        if self.pitch_shifter is not None:
+            self.pitch_shifter.process(block, block)
+        out = self.out[:len(block)]
+        self.delay_line.process(block, out)
+        self.output_chain.run(out, self.params)
+        return out
+
+    def flush(self):
+        remaining = self.tail
+        while remaining > 0:
+            count = min(remaining, len(self.silence))
+            yield self.process(self.silence[:count])
+            remaining -= count
+
+
+def render_file(source, target, delay, gain, faf_semitones, fft_size, chunk):
+    """Tek dosyayı işle: (kaynak, ses süresi, CPU süresi, duvar süresi) döndürür"""
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    reader = open_audio(source)
+    renderer = Renderer(reader.sample_rate, reader.channels, delay, gain, faf_semitones, fft_size, chunk)
+    sink = WavSink(target, reader.sample_rate, reader.channels)
+    try:
+        for block in reader.chunks(chunk):
+            sink.write(renderer.process(block))
+        for out in renderer.flush():
+            sink.write(out)
+    finally:
+        sink.close()
+        reader.close()
+    seconds = reader.frames / reader.sample_rate
+    return source, seconds, time.process_time() - cpu, time.perf_counter() - wall
+
+
+def target_path(source, out_dir):
+    name = os.path.splitext(os.path.basename(source))[0] + '_jammed.wav'
+    return os.path.join(out_dir, name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ses dosyalarının DAF/FAF uygulanmış sürümlerini üret")
+    parser.add_argument('files', nargs='+', help="WAV, MP3, FLAC... (WAV dışı türler soundfile gerektirir)")
+    parser.add_argument('--out-dir', default='rendered')
+    parser.add_argument('--delay', type=float, default=0.18, help="gecikme (saniye)")
+    parser.add_argument('--gain', type=float, default=0.8, help="geri besleme şiddeti")
+    parser.add_argument('--faf', type=float, default=None, metavar='YARIM_TON', help="frekans kaydırma (FAF)")
+    parser.add_argument('--fft-size', type=int, default=1024)
+    parser.add_argument('--chunk', type=int, default=CHUNK, help="parça başına örnek")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="işçi süreç sayısı")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    jobs = max(1, min(args.jobs, len(args.files)))
+    total_seconds = 0.0
+    total_cpu = 0.0
+    failed = 0
+    print(f"{'dosya':<40} {'süre s':>8} {'CPU s':>7} {'x gerçek zaman':>15}")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(render_file, source, target_path(source, args.out_dir), args.delay,
+                            args.gain, args.faf, args.fft_size, args.chunk): source
+            for source in args.files
+        }
+        for future in as_completed(futures):
+            try:
+                source, seconds, cpu, _ = future.result()
+            except Exception as e:
+                print(f"❌ {futures[future]}: {e}")
+                failed += 1
+                continue
+            total_seconds += seconds
+            total_cpu += cpu
+            print(f"{os.path.basename(source)[:40]:<40} {seconds:>8.1f} {cpu:>7.2f} {seconds / max(cpu, 1e-9):>15.0f}")
+    wall = time.perf_counter() - start
+
+    if total_seconds:
+        # Çekirdek başına: işçilerin harcadığı toplam CPU süresine göre
+        print(f"\n{total_seconds:.1f}s ses, {wall:.2f}s içinde {jobs} süreçle: "
+              f"toplam {total_seconds / wall:.0f}x, çekirdek başına {total_seconds / max(total_cpu, 1e-9):.0f}x gerçek zaman")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
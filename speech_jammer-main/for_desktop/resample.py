@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+from math import gcd
+import numpy as np
+
+class PolyphaseResampler:
+    """in_rate'ten out_rate'e akış halinde polifaz örnekleme hızı dönüşümü
+
+    Oran L/M'ye sadeleştirilir (44100 -> 48000 için 160/147). Kaiser
+    pencereli sinc alçak geçiren filtre bir kez tasarlanır ve L fazlı bir
+    filtre bankasına bölünür. Her çıkış örneği kendi fazının taps katsayısı
+    ile girişin son taps örneğinin çarpımıdır (hız düşürülürken taps, M/L
+    oranında artırılır). Blok içindeki tüm çıkışlar hazır indeks ve katsayı
+    dizileriyle tek einsum'da hesaplanır.
+    """
+    def __init__(self, in_rate, out_rate, channels=2, max_block=4096, taps=16, beta=8.0, rolloff=0.9, dtype=np.float32):
+        divisor = gcd(int(in_rate), int(out_rate))
+        self.up = int(out_rate) // divisor    # L
+        self.down = int(in_rate) // divisor   # M
+        # Hız düşürülürken geçiş bandı daralır, filtre de o oranda uzar
+        taps = -(-taps * max(self.up, self.down) // self.up)
+        self.taps = taps
+        self.channels = channels
+        self.max_block = max_block
+
+        # Prototip filtre L kat yükseltilmiş hızda tasarlanır
+        length = self.up * taps
+        cutoff = rolloff * 0.5 * min(1.0, self.up / self.down) / self.up
+        n = np.arange(length) - (length - 1) / 2
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, beta) * self.up
+        # bank[p, k] = h[p + k L], x[taban - k] ile çarpılır; pencere artan
+        # sırada okunduğu için k ekseni ters çevrilir
+        bank = prototype.reshape(taps, self.up).T[:, ::-1]
+        # Her faz ayrı ayrı birim DC kazanca getirilir, yoksa fazdan faza
+        # değişen küçük kazanç farkı sinyale L periyotlu bir dalgalanma ekler
+        self.bank = (bank / bank.sum(axis=1, keepdims=True)).astype(dtype)
+        self.latency = (length - 1) / 2 / self.down  # Çıkış örneği cinsinden grup gecikmesi
+
+        # Geçmiş (taps - 1 örnek) + blok
+        self.history = taps - 1
+        self.buffer = np.zeros((self.history + max_block, channels), dtype=dtype)
+        self.max_output = -(-max_block * self.up // self.down) + 1
+        self.output_index = np.arange(self.max_output, dtype=np.int64)
+        self.tap_index = np.arange(taps, dtype=np.intp)
+        self.base = np.zeros(self.max_output, dtype=np.int64)
+        self.phase = np.zeros(self.max_output, dtype=np.intp)
+        self.window_index = np.zeros((self.max_output, taps), dtype=np.intp)
+        self.windows = np.zeros((self.max_output, taps, channels), dtype=dtype)
+        self.coefficients = np.zeros((self.max_output, taps), dtype=dtype)
+        self.reset()
+
+    def reset(self):
+        self.buffer.fill(0)
+        self.produced = 0   # Üretilen çıkış örneği (döngü başına sarılır)
+        self.consumed = 0   # Tampondaki son girişten sonraki mutlak indeks
+
+    def output_frames(self, frames):
+        """frames giriş örneği verilince üretilecek çıkış sayısı"""
+        total = self.consumed + frames
+        return max(0, (total * self.up + self.down - 1) // self.down - self.produced)
+
+    def process(self, block, out):
+        """block'u dönüştür, çıkışı out'un başına yaz ve çıkış sayısını döndür
+
+        out en az output_frames(len(block)) satır olmalı.
+        """
+        frames = len(block)
+        if frames > self.max_block:
+            raise ValueError(f"Blok {frames} örnek, en fazla {self.max_block}")
+        history = self.history
+        buffer = self.buffer
+        buffer[history:history + frames] = block
+        start = self.consumed - history  # buffer[0]'ın mutlak indeksi
+        self.consumed += frames
+
+        count = self.output_frames(0)
+        if count:
+            # taban = floor(n M / L), faz = n M mod L
+            base = self.base[:count]
+            np.add(self.output_index[:count], self.produced, out=base)
+            base *= self.down
+            phase = self.phase[:count]
+            np.remainder(base, self.up, out=phase, casting='unsafe')
+            base //= self.up
+            base -= start + self.taps - 1
+
+            # İndeksler zaten aralıkta; varsayılan mode='raise' out'u ara tampona kopyalar
+            index = self.window_index[:count]
+            np.add(base[:, np.newaxis], self.tap_index, out=index, casting='unsafe')
+            windows = self.windows[:count]
+            np.take(buffer, index, axis=0, out=windows, mode='clip')
+            coefficients = self.coefficients[:count]
+            np.take(self.bank, phase, axis=0, out=coefficients, mode='clip')
+            np.einsum('ot,otc->oc', coefficients, windows, out=out[:count])
+            self.produced += count
+
+        # Sonraki blok için son taps - 1 girişi başa taşı
+        buffer[:history] = buffer[frames:frames + history]
+        # Sayaçları tam döngülerde sar, taşma olmasın
+        cycles = min(self.produced // self.up, self.consumed // self.down)
+        self.produced -= cycles * self.up
+        self.consumed -= cycles * self.down
+        return count
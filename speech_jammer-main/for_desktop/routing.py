@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+import numpy as np
+
+def input_channel_count(max_input_channels, routes=None, default=2):
+    """Giriş akışının açılacağı kanal sayısı
+
+    routes varsa kullanılan en yüksek giriş kanalına kadar, yoksa default
+    kadar kanal açılır; 4 mikrofonlu dizide dört kanalın hepsi açılır ki
+    stereoya ortalama kuralı uygulanabilsin. Cihazın kanal sayısını geçmez,
+    cihazda olmayan bir kanala yönlendirme routing_matrix'te hata verir.
+    """
+    if routes:
+        needed = max(default, max(route[0] for route in routes) + 1)
+    elif max_input_channels == 4:
+        needed = 4
+    else:
+        needed = default
+    return max(1, min(needed, max_input_channels))
+
+def routing_matrix(input_channels, output_channels, routes=None, dtype='float32'):
+    """Giriş kanallarını çıkış kanallarına eşleyen (giriş, çıkış) karıştırma matrisi
+
+    Akış açılırken bir kez hesaplanır, callback bloğu tek np.dot ile
+    yönlendirir: np.dot(indata, matris, out=çıkış).
+
+    routes verilmezse eski kurallar geçerlidir: mono giriş tüm çıkışlara,
+    4 mikrofonlu dizi stereoya ortalanarak gider, diğer durumlarda ilk
+    kanallar eşlenir ve artan çıkış kanalları sessiz kalır.
+    routes (giriş, çıkış) veya (giriş, çıkış, kazanç) listesidir, kanallar
+    0'dan sayılır. Örnek: [(2, 0)] 3. mikrofon kanalını sadece sol kulağa verir.
+    """
+    matrix = np.zeros((input_channels, output_channels), dtype=dtype)
+    if routes is not None:
+        for route in routes:
+            source, target = route[0], route[1]
+            gain = route[2] if len(route) > 2 else 1.0
+            if not (0 <= source < input_channels and 0 <= target < output_channels):
+                raise ValueError(f"Geçersiz kanal yönlendirmesi {source}->{target} "
+                                 f"({input_channels} giriş, {output_channels} çıkış)")
+            matrix[source, target] += gain
+    elif input_channels == 1:
+        matrix[0, :] = 1.0
+    elif input_channels == 4 and output_channels == 2:
+        matrix[:, :] = 1.0 / input_channels
+    else:
+        for channel in range(min(input_channels, output_channels)):
+            matrix[channel, channel] = 1.0
+    return matrix
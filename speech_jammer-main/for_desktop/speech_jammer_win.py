@@ -3,14 +3,47 @@
 import sounddevice as sd
 import random
 import threading
+from delay_line import DelayLine
+from calibration import latency_store
+from device_registry import registry
+from instrumentation import CallbackMonitor, MonitorReporter
+
+delay_line = None
+monitor = CallbackMonitor()
 
 def callback(indata, outdata, frames, time, status):
-    if status:
-        print(status)
-    outdata[:] = indata[:, :2]
+    # Ses thread'inde print yok, durum bayrakları sayaçlara yazılır
+    start = monitor.begin(status)
+    delay_line.process(indata[:, :outdata.shape[1]], outdata)
+    monitor.end(start)
+
+def open_delay_line(stream, delay):
+    """Gecikme hattını akışın hızında kur, ölçülmüş cihaz gecikmesini düş"""
+    global delay_line
+    input_name = registry.device(stream.device[0], kind='input')['name']
+    output_name = registry.device(stream.device[1])['name']
+    measured = latency_store.get(latency_store.key(input_name, output_name, stream.samplerate)) or 0.0
+    frames = int(max(0.0, delay - measured) * stream.samplerate)
+    delay_line = DelayLine(frames, stream.channels[1], dtype=stream.dtype[1], max_block=stream.blocksize)
+    monitor.reset(stream.samplerate, stream.blocksize)
+
+def close_stream(stream):
+    """Akışı kapat ve kayıttan düş, bekleyen cihaz yenilemesi yapılabilir"""
+    stream.stop()
+    stream.close()
+    registry.untrack(stream)
 
 def main():
     random.seed()
+    
+    # Yeni xrun olduğunda ses thread'i dışından bildir
+    reported = {'xruns': 0}
+    def report_xruns(snapshot):
+        if snapshot['xrun_total'] > reported['xruns']:
+            print(f"Ses durumu: {snapshot['xruns']}")
+        reported['xruns'] = snapshot['xrun_total']
+    MonitorReporter(monitor, report_xruns, interval=1.0).start()
+    
     print("Press Return to start/stop or 'q' for terminate:")
     
     stream = None
@@ -18,19 +51,23 @@ def main():
         user_input = input()
         if user_input == 'q':
             print("Program terminated.")
-            if stream is not None and stream.active:
-                stream.stop()
+            if stream is not None:
+                close_stream(stream)
             break
         elif user_input == '':
             if stream is None or not stream.active:
-                # Stream başlat
-                latency = random.randint(180, 200) / 1000
-                stream = sd.Stream(latency=latency, callback=callback)
+                # Stream başlat: latency PortAudio'nun tampon süresidir,
+                # gecikmenin kendisi gecikme hattında uygulanır
+                delay = random.randint(180, 200) / 1000
+                stream = sd.Stream(latency='low', callback=callback, blocksize=256)
+                registry.track(stream)
+                open_delay_line(stream, delay)
                 stream.start()
                 print("Program started.")
             else:
                 # Stream durdur
-                stream.stop()
+                close_stream(stream)
+                stream = None
                 print("Program stopped...")
 
 if __name__ == "__main__":
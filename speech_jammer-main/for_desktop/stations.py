@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""Tek süreçte birden fazla kabin (mikrofon/kulaklık çifti) çalıştır
+
+İstasyon listesi JSON dosyasından okunur. Her eleman ya bir sözlük
+    {"name": "Kabin 1", "input": "USB", "output": "K55", "delay": 0.18, "gain": 0.8}
+ya da kısa biçimde [giriş, çıkış, gecikme, şiddet] listesidir. Cihazlar
+indeksle ya da adlarında geçen bir kelimeyle verilir, null varsayılan
+cihazdır. Her istasyonun kendi akışı ve gecikme hattı vardır; klavye
+kontrolü ve durum satırı tüm istasyonlar için ortaktır.
+
+Kullanım:
+    python3 stations.py stations.json
+"""
+
+import json
+import sys
+
+import sounddevice as sd
+import numpy as np
+from delay_line import DelayLine
+from dsp_chain import output_chain
+from params import ParamStore
+from voice_activity import VoiceActivityDetector
+from routing import input_channel_count, routing_matrix
+from controls import KeyControls
+from device_registry import registry, watch_hotplug
+from instrumentation import CallbackMonitor, MonitorReporter
+
+MAX_STATIONS = 8
+
+# Tuş -> (eylem, basılı tutunca tekrar etsin mi)
+KEY_BINDINGS = {str(number): (f'select_{number}', False) for number in range(1, MAX_STATIONS + 1)}
+KEY_BINDINGS.update({
+    'tab': ('next', False),
+    'space': ('toggle', False),
+    'a': ('toggle_all', False),
+    'up': ('delay_up', True),
+    'down': ('delay_down', True),
+    'right': ('gain_up', True),
+    'left': ('gain_down', True),
+    'f5': ('rescan', False),
+    'esc': ('quit', False),
+    'q': ('quit', False),
+})
+
+
+class Station:
+    """Tek kabin: kendi akışı, gecikme hattı, şiddet rampası ve sayaçları
+
+    Callback sadece bu istasyonun hazır tamponlarını kullanır; istasyonlar
+    birbirini sadece GIL üzerinden etkiler.
+    """
+    def __init__(self, name, input_device=None, output_device=None, delay=0.18, gain=0.8,
+                 sample_rate=None, blocksize=256, channels=2, voice_gate=True):
+        self.name = name
+        self.input_device = input_device
+        self.output_device = output_device
+        self.delay = delay
+        self.feedback_gain = gain
+        self.requested_rate = sample_rate  # None: çıkış cihazının varsayılan hızı
+        self.sample_rate = sample_rate or 48000  # Akış açılınca cihazdan alınır
+        self.blocksize = blocksize
+        self.channels = channels
+        self.dtype = 'float32'
+        self.max_delay = 0.5
+        self.fade_time = 0.005
+        self.voice_gate = voice_gate
+        self.output_chain = None
+        self.params = ParamStore()
+        self.applied_params = None
+        self.voice_hangover = 0.3
+        self.voice = None
+        self.delay_line = None
+        self.monitor = CallbackMonitor(self.sample_rate, blocksize)
+        self.stream = None
+        self.running = False
+
+    def allocate_buffers(self, input_channels):
+        """Callback'in kullandığı tüm tamponları bir kez ayır"""
+        self.output_chain = output_chain(self.sample_rate).build(self.blocksize, self.channels, self.dtype)
+        self.delay_line = DelayLine(
+            self.delay_frames(), self.channels, dtype=self.dtype,
+            max_length=int(self.max_delay * self.sample_rate),
+            max_block=self.blocksize,
+            fade_length=int(self.fade_time * self.sample_rate)
+        )
+        self.input_audio = np.zeros((self.blocksize, self.channels), dtype=self.dtype)
+        self.routing = routing_matrix(input_channels, self.channels, dtype=self.dtype)
+        self.voice = VoiceActivityDetector(self.blocksize, 0) if self.voice_gate else None
+        self.applied_params = None
+        self.set_delay(self.delay)
+        self.monitor.reset(self.sample_rate, self.blocksize)
+
+    def callback(self, indata, outdata, frames, time, status):
+        start = self.monitor.begin(status)
+        input_audio = self.input_audio[:frames]
+        np.dot(indata, self.routing, out=input_audio)
+        params = self.params.current
+        if params is not self.applied_params:
+            self.delay_line.set_length(params.delay_frames)
+            self.applied_params = params
+
+        # Kabin durdurulmuşsa ya da konuşma yoksa sadece gecikme hattına yaz
+        voice = self.voice
+        if self.output_chain.muted(params) or (voice is not None and not voice.update(input_audio)):
+            self.delay_line.write(input_audio)
+            outdata.fill(0)
+        else:
+            self.delay_line.process(input_audio, outdata)
+            self.output_chain.run(outdata, params)
+        self.monitor.end(start)
+
+    def delay_frames(self):
+        """Gecikme hattının uzunluğu, çıkış aşamalarının gecikmesi düşülmüş"""
+        latency = self.output_chain.latency if self.output_chain is not None else 0
+        return max(0, int(self.delay * self.sample_rate) - latency)
+
+    def set_delay(self, delay):
+        self.delay = min(self.max_delay, max(0.0, delay))
+        self.publish()
+        if self.voice is not None:
+            self.voice.set_hangover(int((self.delay + self.voice_hangover) * self.sample_rate))
+
+    def set_gain(self, gain):
+        self.feedback_gain = gain
+        self.publish()
+
+    def set_running(self, running):
+        self.running = running
+        self.publish()
+
+    def publish(self):
+        """Ayarları tek bir değişmez görüntü olarak callback'e ver"""
+        self.params.publish(gain=self.feedback_gain if self.running else 0.0, delay_frames=self.delay_frames())
+
+    def open(self):
+        """Akışı sessiz olarak aç, hata olursa diğer istasyonlar etkilenmez"""
+        if self.stream is not None:
+            return True
+        try:
+            input_device = resolve_device(self.input_device, 'input')
+            output_device = resolve_device(self.output_device, 'output')
+            input_channels = input_channel_count(registry.device(input_device, kind='input')['max_input_channels'])
+            # Her istasyon kendi çıkış cihazının hızında açılır (44.1 kHz USB kartlar da)
+            self.sample_rate = self.requested_rate or int(registry.device(output_device)['default_samplerate'])
+            self.allocate_buffers(input_channels)
+            self.stream = sd.Stream(
+                device=(input_device, output_device),
+                samplerate=self.sample_rate,
+                blocksize=self.blocksize,
+                latency='low',
+                channels=(input_channels, self.channels),
+                callback=self.callback,
+                dtype=self.dtype
+            )
+            registry.track(self.stream)
+            self.stream.start()
+        except Exception as e:
+            print(f"❌ {self.name}: {e}")
+            self.close()
+            return False
+        return True
+
+    def close(self):
+        self.set_running(False)
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            registry.untrack(self.stream)
+            self.stream = None
+
+
+def resolve_device(spec, kind):
+    """İndeks olduğu gibi, metin adında geçen ilk cihaz, None varsayılan cihaz"""
+    if spec is None or isinstance(spec, int):
+        return spec
+    index = registry.find([spec], kind)
+    if index is None:
+        raise ValueError(f"{spec!r} adında {kind} cihazı bulunamadı")
+    return index
+
+
+def load_stations(path):
+    """JSON istasyon listesini Station nesnelerine çevir"""
+    with open(path) as f:
+        entries = json.load(f)
+    stations = []
+    for number, entry in enumerate(entries, 1):
+        if isinstance(entry, list):
+            entry = dict(zip(('input', 'output', 'delay', 'gain'), entry))
+        settings = dict(entry)
+        name = settings.pop('name', f"Kabin {number}")
+        input_device = settings.pop('input', None)
+        output_device = settings.pop('output', None)
+        stations.append(Station(name, input_device, output_device, **settings))
+    if not 1 <= len(stations) <= MAX_STATIONS:
+        raise ValueError(f"1 ile {MAX_STATIONS} arasında istasyon gerekli, {len(stations)} verildi")
+    return stations
+
+
+class StationGroup:
+    """İstasyonların ortak kontrolü ve telemetrisi
+
+    snapshot() tüm istasyonların sayaçlarını döndürür, böylece tek bir
+    MonitorReporter thread'i hepsini okur.
+    """
+    def __init__(self, stations):
+        self.stations = stations
+        self.selected = 0
+
+    def open(self):
+        return sum(station.open() for station in self.stations)
+
+    def close(self):
+        for station in self.stations:
+            station.close()
+
+    def rescan(self):
+        """Tüm akışları kapat, cihaz listesini yenile, istasyonları önceki durumlarıyla aç
+
+        Cihazlar adla verildiyse yeniden adla bulunur, indeksle verilenler
+        yeni listede başka bir cihazı gösterebilir.
+        """
+        running = [station.running for station in self.stations]
+        self.close()
+        registry.rescan()
+        opened = self.open()
+        for station, was_running in zip(self.stations, running):
+            station.set_running(was_running and station.stream is not None)
+        return opened
+
+    def current(self):
+        return self.stations[self.selected]
+
+    def select(self, index):
+        if 0 <= index < len(self.stations):
+            self.selected = index
+        return self.current()
+
+    def snapshot(self):
+        return [station.monitor.snapshot() for station in self.stations]
+
+
+def station_text(number, station, snapshot, selected):
+    """Tek istasyonun kısa durumu: durum, gecikme, şiddet, yük ve xrun"""
+    if station.stream is None:
+        state = "❌"
+    else:
+        state = "🔴" if station.running else "⚪"
+    text = (f"{number}{state} {station.delay*1000:.0f}ms %{station.feedback_gain*100:.0f} "
+            f"p99 %{snapshot['load_p99']:.0f} x{snapshot['xrun_total']}")
+    return f"[{text}]" if selected else f" {text} "
+
+
+def status_line(group, snapshots):
+    """Tüm istasyonlar tek satırda, seçili olan köşeli parantezde"""
+    line = "|".join(
+        station_text(index + 1, station, snapshot, index == group.selected)
+        for index, (station, snapshot) in enumerate(zip(group.stations, snapshots))
+    )
+    print(line, end="\r")
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Kullanım: python3 stations.py stations.json")
+        return 1
+    stations = load_stations(sys.argv[1])
+
+    print("🎤 Speech Jammer - Çok İstasyonlu")
+    print("=" * 40)
+
+    group = StationGroup(stations)
+    opened = group.open()
+    print(f"{opened}/{len(stations)} istasyon açıldı")
+
+    # Tüm istasyonlar için tek durum thread'i
+    reporter = MonitorReporter(group, lambda snapshots: status_line(group, snapshots))
+    reporter.start()
+
+    print("\n🎮 Kontroller:")
+    print(f"1-{len(stations)} / TAB = İstasyon seç")
+    print("SPACE = Seçili istasyonu başlat/durdur")
+    print("A = Tüm istasyonları başlat/durdur")
+    print("↑/↓ = Gecikmeyi artır/azalt (+/- 10ms)")
+    print("→/← = Ses şiddetini artır/azalt")
+    print("F5 = Cihazları yeniden tara")
+    print("ESC veya Q = Çıkış\n")
+
+    controls = KeyControls(KEY_BINDINGS)
+    controls.start()
+    # Ses kartı ya da Bluetooth kulaklık takılıp çıkarılınca F5 gibi yeniden taranır
+    watch_hotplug(registry, on_change=lambda: controls.post('rescan'))
+
+    try:
+        while True:
+            action = controls.get()
+            station = group.current()
+
+            if action.startswith('select_'):
+                station = group.select(int(action[len('select_'):]) - 1)
+                print(f"\n🎯 Seçili: {station.name}")
+
+            elif action == 'next':
+                station = group.select((group.selected + 1) % len(group.stations))
+                print(f"\n🎯 Seçili: {station.name}")
+
+            elif action == 'toggle':
+                if station.stream is None and not station.open():
+                    continue
+                station.set_running(not station.running)
+                print(f"\n{'▶️' if station.running else '⏹️'}  {station.name}")
+
+            elif action == 'toggle_all':
+                # Herhangi biri çalışıyorsa hepsi durur, yoksa açık olanların hepsi başlar
+                running = not any(station.running for station in group.stations)
+                for station in group.stations:
+                    station.set_running(running and station.stream is not None)
+                print(f"\n{'▶️  Tüm istasyonlar başladı' if running else '⏹️  Tüm istasyonlar durdu'}")
+
+            elif action == 'delay_up':
+                station.set_delay(min(0.5, station.delay + 0.01))
+
+            elif action == 'delay_down':
+                station.set_delay(max(0.05, station.delay - 0.01))
+
+            elif action == 'gain_up':
+                station.set_gain(min(1.0, station.feedback_gain + 0.1))
+
+            elif action == 'gain_down':
+                station.set_gain(max(0.1, station.feedback_gain - 0.1))
+
+            elif action == 'rescan':
+                print("\n🔄 Cihazlar yeniden taranıyor...")
+                opened = group.rescan()
+                print(f"{opened}/{len(group.stations)} istasyon açıldı")
+
+            elif action == 'quit':
+                print("\n👋 Program sonlandırılıyor...")
+                break
+
+    except KeyboardInterrupt:
+        print("\n👋 Program sonlandırılıyor...")
+    finally:
+        reporter.stop()
+        controls.stop()
+        group.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+
+import time
+import numpy as np
+from resample import PolyphaseResampler
+
+class SampleRing:
+    """Tek yazar / tek okuyuculu kilitsiz örnek halkası
+
+    Giriş callback'i write(), çıkış callback'i read_resampled() çağırır.
+    Her sayaç sadece kendi thread'inde değişir, diğer taraf sadece okur.
+    Yer yoksa blok atılır, yeterli örnek yoksa okuma yapılmaz; iki taraf
+    da hiçbir zaman beklemez.
+    """
+    def __init__(self, capacity, channels=2, max_block=4096, dtype=np.float32):
+        self.capacity = capacity
+        self.buffer = np.zeros((capacity, channels), dtype=dtype)
+        self.write_count = 0
+        self.read_count = 0
+        self.phase = 0.0  # read_count'tan sonraki kesirli okuma konumu
+        self.overruns = 0
+        self.underruns = 0
+        self.dropped = 0  # Yer olmadığı için atılan örnek sayısı
+        # Kesirli okuma için hazır diziler
+        self.sample_index = np.arange(max_block, dtype=np.float64)
+        self.read_position = np.zeros(max_block)
+        self.read_whole = np.zeros(max_block)
+        self.read_fraction = np.zeros((max_block, 1), dtype=dtype)  # Halkanın tipinde, çarpım dönüşümsüz
+        self.read_index = np.zeros(max_block, dtype=np.intp)
+        self.following = np.zeros((max_block, channels), dtype=dtype)
+
+    def available(self):
+        """Okunmayı bekleyen örnek sayısı (kesirli konum düşülmüş)"""
+        return self.write_count - self.read_count - self.phase
+
+    def write(self, block):
+        """block'u halkaya yaz, yer yoksa atıp False döndür"""
+        frames = len(block)
+        if frames > self.capacity - (self.write_count - self.read_count):
+            self.overruns += 1
+            self.dropped += frames
+            return False
+        position = self.write_count % self.capacity
+        first = min(frames, self.capacity - position)
+        self.buffer[position:position + first] = block[:first]
+        self.buffer[:frames - first] = block[first:]
+        # Sayaç veriden sonra güncellenir, okuyucu yarım blok görmez
+        self.write_count += frames
+        return True
+
+    def read_resampled(self, out, ratio):
+        """Halkadan her çıkış örneği için ratio örnek ilerleyerek oku
+
+        ratio 1'den biraz büyükse halka daha hızlı boşalır. İki komşu örnek
+        arasında doğrusal aradeğerleme yapılır. Yeterli örnek yoksa out
+        sessiz bırakılır ve False döner.
+        """
+        frames = len(out)
+        last = self.phase + ratio * (frames - 1)
+        if int(last) + 2 > self.write_count - self.read_count:
+            self.underruns += 1
+            out.fill(0)
+            return False
+
+        position = self.read_position[:frames]
+        np.multiply(self.sample_index[:frames], ratio, out=position)
+        position += self.phase + self.read_count % self.capacity
+        whole = self.read_whole[:frames]
+        np.floor(position, out=whole)
+        # Kesir float64'te hesaplanıp tampon tipine kopyalanır, ufunc dönüşüm tamponu ayırmaz
+        np.subtract(position, whole, out=position)
+        fraction = self.read_fraction[:frames]
+        np.copyto(fraction[:, 0], position, casting='same_kind')
+        index = self.read_index[:frames]
+        np.copyto(index, whole, casting='unsafe')
+
+        following = self.following[:frames]
+        np.take(self.buffer, index, axis=0, out=out, mode='wrap')
+        index += 1
+        np.take(self.buffer, index, axis=0, out=following, mode='wrap')
+        np.subtract(following, out, out=following)
+        np.multiply(following, fraction, out=following)
+        np.add(out, following, out=out)
+
+        advance = self.phase + ratio * frames
+        step = int(advance)
+        self.phase = advance - step
+        self.read_count += step
+        return True
+
+    def readable(self, limit=None):
+        """Okunmamış örnekleri kopyalamadan en fazla iki dilim olarak döndür"""
+        count = self.write_count - self.read_count
+        if limit is not None:
+            count = min(count, limit)
+        position = self.read_count % self.capacity
+        first = min(count, self.capacity - position)
+        return self.buffer[position:position + first], self.buffer[:count - first]
+
+    def skip(self, frames):
+        """Okuyucuyu frames örnek ileri al (okunan dilimleri bırakmak ya da yeniden hizalamak için)"""
+        self.read_count += frames
+
+
+class StreamLink:
+    """Ayrı giriş ve çıkış akışlarını saat kayması düzeltmesiyle birleştir
+
+    Giriş tarafı kendi hızında yazar; hızlar farklıysa bloklar önce
+    PolyphaseResampler ile çıkış hızına çevrilir. Çıkış tarafı halkayı
+    ratio hızında okur. ratio, halkanın ortalama doluluğunu target
+    örnekte tutan bir PI denetleyiciyle her blokta güncellenir; kararlı
+    durumda ratio iki saat arasındaki kaymanın kendisidir (ppm olarak
+    drift_ppm()). Doluluk, son yazmadan beri geçen sürede yakalanmış ama
+    henüz yazılmamış örneklerle düzeltilir; böylece iki callback'in
+    birbirine göre kayan zamanlaması ölçüme testere dişi olarak girmez.
+    Toplam bağlantı gecikmesi latency örnektir, gecikme hattı bu kadar kısa
+    tutulur.
+    """
+    def __init__(self, in_rate, out_rate, channels=2, in_block=256, out_block=256,
+                 target=None, time_constant=2.0, max_ppm=2000.0, dtype=np.float32):
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.resampler = None
+        self.resampled = None
+        if int(in_rate) != int(out_rate):
+            self.resampler = PolyphaseResampler(in_rate, out_rate, channels, max_block=in_block, dtype=dtype)
+            self.resampled = np.zeros((self.resampler.max_output, channels), dtype=dtype)
+            write_block = self.resampler.max_output
+        else:
+            write_block = in_block
+        # İki callback'in zamanlama titremesini karşılayacak kadar doluluk
+        self.target = target if target is not None else 2 * (write_block + out_block)
+        self.ring = SampleRing(4 * (self.target + write_block + out_block), channels, max_block=out_block, dtype=dtype)
+        self.latency = self.target + (self.resampler.latency if self.resampler else 0)
+
+        # PI denetleyici: zaman sabiti time_constant saniye, kritik sönümlü
+        self.time_constant = time_constant
+        self.max_ratio = max_ppm * 1e-6
+        self.reset()
+
+    def reset(self):
+        self.ratio = 1.0
+        self.integral = 0.0
+        self.average = float(self.target)
+        self.primed = False
+        self.realigns = 0
+        self.write_time = None
+
+    def write(self, block, now=None):
+        """Giriş callback'i: bloğu (gerekirse hız çevirerek) halkaya yaz"""
+        if self.resampler is not None:
+            count = self.resampler.process(block, self.resampled)
+            block = self.resampled[:count]
+        self.ring.write(block)
+        self.write_time = time.perf_counter() if now is None else now
+
+    def read(self, out, now=None):
+        """Çıkış callback'i: halkadan kayma düzeltmeli olarak out'u doldur"""
+        frames = len(out)
+        ring = self.ring
+        fill = ring.available()
+        if now is None:
+            now = time.perf_counter()
+        if not self.primed:
+            # Başta ve boşalmadan sonra hedef doluluğa kadar sessiz bekle
+            if fill < self.target + frames:
+                out.fill(0)
+                return False
+            ring.skip(int(fill) - self.target)
+            self.average = float(self.target)
+            self.primed = True
+            fill = ring.available()
+        elif fill > ring.capacity - frames:
+            # Okuyucu çok geride kaldı, hedefe atla
+            ring.skip(int(fill) - self.target)
+            self.realigns += 1
+            fill = ring.available()
+
+        # Ortalama doluluk: yolda olan örnekler eklenir, blok süresine göre
+        # ağırlıklı hareketli ortalama alınır
+        seconds = frames / self.out_rate
+        pending = 0.0
+        if self.write_time is not None:
+            pending = min(max(now - self.write_time, 0.0), 0.1) * self.out_rate
+        alpha = min(1.0, seconds / (self.time_constant / 4))
+        self.average += alpha * (fill + pending - self.average)
+        error = (self.average - self.target) / self.out_rate  # saniye
+        omega = 1.0 / self.time_constant
+        self.integral += omega * omega * error * seconds
+        self.integral = min(self.max_ratio, max(-self.max_ratio, self.integral))
+        ratio = 1.0 + self.integral + 2 * omega * error
+        self.ratio = min(1.0 + self.max_ratio, max(1.0 - self.max_ratio, ratio))
+
+        if not ring.read_resampled(out, self.ratio):
+            self.primed = False
+            return False
+        return True
+
+    def drift_ppm(self):
+        """Giriş saatinin çıkış saatine göre tahmini kayması (milyonda bir)"""
+        return self.integral * 1e6
+
+    def delay_error(self):
+        """Ortalama doluluğun hedeften sapması (saniye)"""
+        return (self.average - self.target) / self.out_rate
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+import numpy as np
+
+class VoiceActivityDetector:
+    """Blok başına enerji ve sıfır geçiş oranı ile konuşma algılama
+
+    Blok, enerjisi threshold_db'yi geçerse ya da enerjisi biraz daha düşük
+    olup sıfır geçiş oranı yüksekse (s, ş, f gibi sessiz ünsüzler) konuşma
+    sayılır. Son konuşmadan sonra hangover örnek boyunca etkin kalır.
+    Hesap ilk kanal üzerinde, hazır dizilerle ve yeni dizi ayırmadan yapılır.
+    """
+    def __init__(self, blocksize, hangover, threshold_db=-50.0, zcr_threshold=0.25):
+        self.hangover = hangover  # Sessizlikten sonra etkin kalma süresi (örnek)
+        self.threshold = 10.0 ** (threshold_db / 10.0)  # Ortalama kare eşiği
+        self.zcr_threshold = zcr_threshold
+        self.signs = np.zeros(blocksize, dtype=bool)
+        self.changes = np.zeros(max(blocksize - 1, 1), dtype=bool)
+        self.remaining = 0
+        self.active = False
+        self.reset()
+
+    def reset(self):
+        """Görev döngüsü sayaçlarını sıfırla"""
+        self.frames = 0
+        self.active_frames = 0
+
+    def set_hangover(self, hangover):
+        self.hangover = int(hangover)
+
+    def update(self, block):
+        """Bloğu değerlendir, blok etkin yoldan işlenecekse True döndür"""
+        frames = len(block)
+        channel = block[:, 0]
+        energy = float(np.dot(channel, channel)) / frames
+
+        speech = energy > self.threshold
+        if not speech and energy > self.threshold * 0.25 and frames > 1:
+            signs = self.signs[:frames]
+            changes = self.changes[:frames - 1]
+            np.signbit(channel, out=signs)
+            np.not_equal(signs[1:], signs[:-1], out=changes)
+            speech = np.count_nonzero(changes) > self.zcr_threshold * (frames - 1)
+
+        if speech:
+            self.remaining = self.hangover
+        else:
+            self.remaining = max(0, self.remaining - frames)
+        self.active = speech or self.remaining > 0
+
+        self.frames += frames
+        if self.active:
+            self.active_frames += frames
+        return self.active
+
+    def duty_cycle(self):
+        """Etkin yoldan işlenen örneklerin oranı (0-1)"""
+        return self.active_frames / self.frames if self.frames else 0.0
@@ -1,122 +1,509 @@
 from evdev import InputDevice, categorize, ecodes
 import evdev
-import time
-import subprocess
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import sys
 import random
-from select import select
+import numpy as np
+import sounddevice as sd
 import RPi.GPIO as GPIO
 
+# same ring buffer delay line as the desktop SpeechJammer
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "for_desktop"))
+from delay_line import DelayLine, DelayModulator
+from voice_activity import VoiceActivityDetector
+from gain_ramp import GainRamp
+from calibration import LatencyCalibrator, latency_store
+from device_registry import registry
 
-def main():
-    print("Starting...")
+# config
+# change the device name and button codes to match your controller.
+# You can learn these values by using the Evdev library.
+btDeviceName = "MOCUTE-051_A30-1986"
+silenceBtn = 305
+safeShutdownBtn1 = 308
+safeShutdownBtn2 = 304
+delayMin = 180000
+delayMax = 220000
+# let the delay wander inside delayMin..delayMax while enabled instead of
+# keeping one random value, changing by this many seconds per second
+modulateDelay = False
+delayModulationRate = 0.01
+
+shutdownBtnHoldSec = 5
+statusLedPin = 17
+
+# usb sound card, matched against the PortAudio device names
+audioDevice = "hw:1,0"
+audioBlocksize = 128
+# retry opening the sound card this often at boot, doubling up to the max (seconds)
+audioRetryMinSec = 1
+audioRetryMaxSec = 30
+# keep playing this long after the delayed speech has finished (seconds)
+voiceHangoverSec = 0.3
+
+
+class DafEngine:
+    """In-process capture -> delay -> playback, replaces spawning alsaloop.
+
+    The sound card is opened once at boot and the stream never stops, so the
+    delay line is always primed. The silence button only gates the output,
+    fading it in or out over one block so toggling does not click.
+    With modulateDelay set the delay keeps wandering inside the band and
+    is read with interpolation (DelayModulator + process_fractional).
+    While muted or while nobody is speaking the callback only writes into the
+    delay line and outputs silence. The detector only runs while unmuted, so
+    dutyCycle() reports the share of the enabled time spent on the delay path.
+    The round trip measured by calibrate() (run with --calibrate) is stored
+    per device and taken off the delay, so delayMin/delayMax are what the
+    wearer actually hears.
+    """
+
+    def __init__(self, device, maxDelayUs, blocksize=128):
+        self.device = device
+        self.maxDelayUs = maxDelayUs
+        self.blocksize = blocksize
+        self.sampleRate = 48000
+        self.active = False
+        self.delayLine = None
+        self.voice = None
+        self.roundTrip = 0
+        self.latencyKey = None
+        self.calibration = None
+        self.stream = None
+        self.ramp = None
+        self.modulator = None
+
+    def open(self):
+        # resolved through the shared cached device list, by name so a
+        # refreshed list cannot point an old index at another card
+        inputIndex = registry.find([self.device], "input")
+        outputIndex = registry.find([self.device], "output")
+        if inputIndex is None or outputIndex is None:
+            raise ValueError(f"sound card {self.device} not found")
+        info = registry.device(inputIndex, "input")
+        outputInfo = registry.device(outputIndex, "output")
+        self.sampleRate = int(info["default_samplerate"])
+        self.latencyKey = latency_store.key(info["name"], outputInfo["name"], self.sampleRate)
+        measured = latency_store.get(self.latencyKey)
+        self.roundTrip = int(measured * self.sampleRate) if measured else 0
+        maxFrames = self.usToFrames(self.maxDelayUs)
+        self.delayLine = DelayLine(
+            maxFrames,
+            1,
+            dtype="float32",
+            max_length=maxFrames,
+            max_block=self.blocksize,
+            fade_length=int(0.005 * self.sampleRate),
+        )
+        self.delayed = np.zeros((self.blocksize, 1), dtype="float32")
+        self.ramp = GainRamp(self.blocksize, "float32")
+        self.voice = VoiceActivityDetector(self.blocksize, 0)
+        self.updateHangover(maxFrames)
+        self.stream = sd.Stream(
+            device=(inputIndex, outputIndex),
+            samplerate=self.sampleRate,
+            blocksize=self.blocksize,
+            latency="low",
+            channels=(1, min(2, outputInfo["max_output_channels"])),
+            dtype="float32",
+            callback=self.callback,
+        )
+        registry.track(self.stream)
+        self.stream.start()
+
+    def close(self):
+        if self.stream:
+            self.stream.stop()
+            self.stream.close()
+            registry.untrack(self.stream)
+            self.stream = None
+
+    def usToFrames(self, delayUs):
+        return delayUs * self.sampleRate // 1000000
+
+    def setDelay(self, delayUs, bandUs=None):
+        # the sound card and the headphones already add roundTrip frames
+        frames = max(0, self.usToFrames(delayUs) - self.roundTrip)
+        if bandUs is None:
+            self.modulator = None
+            self.delayLine.set_length(frames)
+            self.updateHangover(frames)
+            return
+        # start at delayUs and wander inside the band, the curve is made
+        # once per block and read with interpolation
+        low, high = (max(0, self.usToFrames(us) - self.roundTrip) for us in bandUs)
+        self.modulator = DelayModulator(frames, low, high, delayModulationRate, max_block=self.blocksize)
+        self.updateHangover(high)
+
+    def calibrate(self):
+        # plays a chirp, records it back and stores the round trip in seconds
+        calibrator = LatencyCalibrator(self.sampleRate)
+        frames = calibrator.run(lambda calibration: setattr(self, "calibration", calibration))
+        if frames is None:
+            return None
+        self.roundTrip = frames
+        latency_store.set(self.latencyKey, frames / self.sampleRate)
+        return frames / self.sampleRate
+
+    def updateHangover(self, delayFrames):
+        # stay on until the delayed copy of the last word has been played
+        self.voice.set_hangover(delayFrames + int(voiceHangoverSec * self.sampleRate))
+
+    def dutyCycle(self):
+        return self.voice.duty_cycle() if self.voice else 0.0
+
+    def resetDutyCycle(self):
+        if self.voice:
+            self.voice.reset()
+
+    def callback(self, indata, outdata, frames, time, status):
+        calibration = self.calibration
+        if calibration is not None:
+            calibration.process(indata, outdata)
+            return
+        # the delay line keeps running while muted so it is always primed,
+        # the detector only runs (and counts) while the jammer is enabled
+        active = self.active
+        ramp = self.ramp
+        if active:
+            silent = not self.voice.update(indata)
+        else:
+            # muted: only keep going until the fade out has been played
+            silent = ramp.gain == 0.0
+        if silent:
+            # cheap path: nothing would be heard, skip the read and the copy
+            self.delayLine.write(indata)
+            outdata.fill(0)
+            return
+        delayed = self.delayed[:frames]
+        modulator = self.modulator
+        if modulator is not None:
+            self.delayLine.process_fractional(indata, delayed, modulator.next_block(frames))
+        else:
+            self.delayLine.process(indata, delayed)
+        target = 1.0 if active else 0.0
+        if ramp.gain != target:
+            # enabled or disabled since the last block: fade instead of switching
+            ramp.apply(delayed, target)
+        np.copyto(outdata, delayed)
+
+
+class InputHotplug:
+    """Wakes up when nodes under path (/dev/input by default) appear, disappear
+    or get their permissions set.
 
-    # config
-    # change the device name and button codes to match your controller.
-    # You can learn these values by using the Evdev library.
-    btDeviceName = "MOCUTE-051_A30-1986"
-    silenceBtn = 305
-    safeShutdownBtn1 = 308
-    safeShutdownBtn2 = 304
-    delayMin = 180000
-    delayMax = 220000
+    Uses inotify through libc so there is no extra dependency. udev creates
+    the node first and fixes its permissions afterwards, so IN_ATTRIB is
+    watched as well.
+    """
 
-    shutdownBtnHoldSec = 5
-    statusLedPin = 17
+    IN_ATTRIB = 0x00000004
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+
+    def __init__(self, path="/dev/input"):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = self.IN_CREATE | self.IN_DELETE | self.IN_ATTRIB
+        if libc.inotify_add_watch(self.fd, path.encode(), mask) < 0:
+            raise OSError(ctypes.get_errno(), f"cannot watch {path}")
+
+    def fileno(self):
+        return self.fd
+
+    def close(self):
+        os.close(self.fd)
+
+    def drain(self):
+        try:
+            while os.read(self.fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    async def changed(self, timeout=None):
+        # returns True if something changed under the path before the timeout,
+        # the event loop watches the fd so nothing polls in between
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+
+        def ready():
+            self.drain()
+            event.set()
+
+        loop.add_reader(self.fd, ready)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            loop.remove_reader(self.fd)
+
+
+class StatusLed:
+    """The status led, blink and flash patterns run as tasks.
+
+    Starting a pattern or setting a steady state cancels the pattern that is
+    running, so animations never hold up input handling.
+    """
+
+    def __init__(self, pin):
+        self.pin = pin
+        self.task = None
+
+    def output(self, on):
+        GPIO.output(self.pin, GPIO.HIGH if on else GPIO.LOW)
+
+    def set(self, on):
+        self.cancel()
+        self.output(on)
+
+    def cancel(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def start(self, pattern):
+        self.cancel()
+        self.task = asyncio.ensure_future(pattern)
+        return self.task
+
+    def blink(self, interval=0.5):
+        return self.start(self.blinkPattern(interval))
+
+    def flash(self, count=6, interval=0.1):
+        return self.start(self.flashPattern(count, interval))
+
+    async def blinkPattern(self, interval):
+        on = False
+        while True:
+            on = not on
+            self.output(on)
+            await asyncio.sleep(interval)
+
+    async def flashPattern(self, count, interval):
+        for i in range(count):
+            self.output(True)
+            await asyncio.sleep(interval)
+            self.output(False)
+            await asyncio.sleep(interval)
+
+
+class ChordHold:
+    """Runs onHold() once every button of the chord has been held for holdSec.
+
+    A timer is armed when the last button goes down and cancelled when any of
+    them goes up, nothing is polled while the buttons are held.
+    """
+
+    def __init__(self, buttons, holdSec, onHold):
+        self.buttons = set(buttons)
+        self.holdSec = holdSec
+        self.onHold = onHold
+        self.held = set()
+        self.timer = None
+        self.task = None
+
+    def press(self, code):
+        self.held.add(code)
+        if self.held == self.buttons and self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.holdSec, self.fire)
+
+    def release(self, code):
+        self.held.discard(code)
+        self.cancel()
+
+    def cancel(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def fire(self):
+        self.timer = None
+        self.held.clear()
+        self.task = asyncio.ensure_future(self.onHold())
+
+
+def main():
+    print("Starting...")
 
     GPIO.setmode(GPIO.BCM)
     GPIO.setup(statusLedPin, GPIO.OUT)
-    connectToController()
 
+    engine = DafEngine(audioDevice, delayMax, audioBlocksize)
+
+    if "--calibrate" in sys.argv:
+        # hold the headphones against the mic while the chirps play
+        engine.open()
+        latency = engine.calibrate()
+        if latency is None:
+            print("Calibration failed, the chirp was not picked up.")
+        else:
+            print(f"Round trip latency: {latency * 1000:.1f} ms, saved.")
+        engine.close()
+        return
+
+    asyncio.run(control(engine))
+
+
+async def control(engine):
+    # everything below waits on fds and timers, the cpu sleeps between events
+    loop = asyncio.get_running_loop()
+    led = StatusLed(statusLedPin)
+    opened = loop.create_future()
+    engineTask = asyncio.ensure_future(runEngine(engine, opened))
+    try:
+        await opened
+        # reconnects are a plain loop, the stack and open fds stay flat
+        hotplug = InputHotplug()
+        knownDevices = {}
+        while True:
+            btDevicePath = await connectToController(hotplug, knownDevices, led)
+            await runDaf(btDevicePath, engine, led)
+    finally:
+        led.cancel()
+        engineTask.cancel()
+        await asyncio.gather(engineTask, return_exceptions=True)
+
+
+async def runEngine(engine, opened):
+    # open the sound card once, the button only gates the output;
+    # the card stays open until this task is cancelled
+    loop = asyncio.get_running_loop()
+    await openWithRetry(engine, loop)
+    opened.set_result(None)
+    try:
+        await loop.create_future()
+    finally:
+        engine.close()
+
+
+async def openWithRetry(engine, loop):
+    # at cold boot the usb card may not be enumerated yet: back off and try
+    # again, waking early when a node shows up under /dev/snd
+    try:
+        soundHotplug = InputHotplug("/dev/snd")
+    except OSError:
+        soundHotplug = None
+    backoff = audioRetryMinSec
+    try:
+        while True:
+            try:
+                await loop.run_in_executor(None, engine.open)
+                return
+            except Exception as e:
+                print(f"Sound card not ready ({e}), retrying in {backoff}s")
+            engine.close()
+            # the next lookup re-enumerates, no stream is open
+            registry.invalidate()
+            if soundHotplug is None:
+                await asyncio.sleep(backoff)
+            else:
+                await soundHotplug.changed(backoff)
+            backoff = min(backoff * 2, audioRetryMaxSec)
+    finally:
+        if soundHotplug is not None:
+            soundHotplug.close()
+
+
+def scanInputDevices(knownDevices):
+    # knownDevices caches path -> name, only new nodes get opened
+    paths = set(evdev.list_devices())
+    for path in list(knownDevices):
+        if path not in paths:
+            del knownDevices[path]
+    for path in paths - set(knownDevices):
+        try:
+            device = evdev.InputDevice(path)
+        except OSError:
+            # udev has not set the permissions yet, IN_ATTRIB will wake us again
+            continue
+        knownDevices[path] = device.name
+        device.close()
 
-def connectToController():
-    btDevicePath = ""
-    while btDevicePath == "":
-        print("Waiting for bt device to connect...")
-        devices = [evdev.InputDevice(path) for path in evdev.list_devices()]
-        for device in devices:
-            if device.name == btDeviceName:
-                btDevicePath = device.path
+
+async def connectToController(hotplug, knownDevices, led):
+    print("Waiting for bt device to connect...")
+    # blink while waiting, only a hotplug event triggers a rescan
+    led.blink(0.5)
+    while True:
+        scanInputDevices(knownDevices)
+        for path, name in knownDevices.items():
+            if name == btDeviceName:
                 print("Bt controller connected!")
-        GPIO.output(statusLedPin, GPIO.HIGH)
-        time.sleep(0.5)
-        GPIO.output(statusLedPin, GPIO.LOW)
-        time.sleep(0.5)
-    runDaf(btDevicePath)
+                return path
+        await hotplug.changed()
+
 
+async def shutdown(led):
+    print("Shutting down!")
+    # flash the led to indicate shutdown, a button press that cancels the
+    # pattern must not cancel the shutdown itself
+    await asyncio.wait({led.flash(6, 0.1)})
+    process = await asyncio.create_subprocess_shell("sudo shutdown -h now")
+    await process.wait()
 
-def runDaf(btDevicePath):
+
+async def runDaf(btDevicePath, engine, led):
     print("DAF Service started.")
-    gamepad = InputDevice(btDevicePath)
+    try:
+        gamepad = InputDevice(btDevicePath)
+    except OSError:
+        # gone again before we could open it, go back to waiting
+        print("Controller disconnected.")
+        return
     random.seed()
     silencerActive = 0
-    shutdownBtn1Timer = 0
-    shutdownBtn2Timer = 0
+    shutdownChord = ChordHold((safeShutdownBtn1, safeShutdownBtn2), shutdownBtnHoldSec, lambda: shutdown(led))
+    led.set(False)
     try:
-        while True:
-            r, _, _ = select([gamepad], [], [], 0.1)
-            if r:
-                for event in gamepad.read():
-                    if event.type == ecodes.EV_KEY:
-                        if event.value == 1:
-                            if event.code == silenceBtn:
-                                if silencerActive == 0:
-                                    # randomize delay each time it's activated
-                                    randomDelay = random.randint(delayMin, delayMax)
-                                    alsaProcess = subprocess.Popen(
-                                        [
-                                            "alsaloop",
-                                            "-C",
-                                            "hw:1,0",
-                                            "-c",
-                                            "1",
-                                            "-P",
-                                            "plughw:1,0",
-                                            "-t",
-                                            randomDelay,
-                                        ]
-                                    )
-                                    GPIO.output(statusLedPin, GPIO.HIGH)
-                                    silencerActive = 1
-                                    print(f"Silencer enabled ({randomDelay})")
-                                else:
-                                    alsaProcess.terminate()
-                                    GPIO.output(statusLedPin, GPIO.LOW)
-                                    silencerActive = 0
-                                    print("Silencer disabled")
-                            elif event.code == safeShutdownBtn1:
-                                print("Shutdown1 down")
-                                shutdownBtn1Timer = time.time()
-                            elif event.code == safeShutdownBtn2:
-                                print("Shutdown2 down")
-                                shutdownBtn2Timer = time.time()
-                        if event.value == 0:
-                            if event.code == safeShutdownBtn1:
-                                print("Shutdown1 up")
-                                shutdownBtn1Timer = 0
-                            elif event.code == safeShutdownBtn2:
-                                print("Shutdown2 up")
-                                shutdownBtn2Timer = 0
-            if shutdownBtn1Timer != 0 and shutdownBtn2Timer != 0:
-                if (shutdownBtn1Timer + shutdownBtnHoldSec) < time.time() and (
-                    shutdownBtn2Timer + shutdownBtnHoldSec
-                ) < time.time():
-                    print("Shutting down!")
-                    # flash the led to indicate shutdown
-                    shutdownBtn1Timer = 0
-                    shutdownBtn2Timer = 0
-                    for i in range(6):
-                        GPIO.output(statusLedPin, GPIO.HIGH)
-                        time.sleep(0.1)
-                        GPIO.output(statusLedPin, GPIO.LOW)
-                        time.sleep(0.1)
-                    subprocess.call("sudo shutdown -h now", shell=True)
-    except:
+        async for event in gamepad.async_read_loop():
+            if event.type != ecodes.EV_KEY:
+                continue
+            if event.value == 1:
+                if event.code == silenceBtn:
+                    if silencerActive == 0:
+                        # randomize delay each time it's activated
+                        randomDelay = random.randint(delayMin, delayMax)
+                        engine.setDelay(randomDelay, (delayMin, delayMax) if modulateDelay else None)
+                        engine.resetDutyCycle()
+                        engine.active = True
+                        led.set(True)
+                        silencerActive = 1
+                        print(f"Silencer enabled ({randomDelay}{', modulated' if modulateDelay else ''})")
+                    else:
+                        engine.active = False
+                        led.set(False)
+                        silencerActive = 0
+                        print(f"Silencer disabled (duty cycle {engine.dutyCycle():.0%})")
+                elif event.code == safeShutdownBtn1:
+                    print("Shutdown1 down")
+                    shutdownChord.press(event.code)
+                elif event.code == safeShutdownBtn2:
+                    print("Shutdown2 down")
+                    shutdownChord.press(event.code)
+            elif event.value == 0:
+                if event.code == safeShutdownBtn1:
+                    print("Shutdown1 up")
+                    shutdownChord.release(event.code)
+                elif event.code == safeShutdownBtn2:
+                    print("Shutdown2 up")
+                    shutdownChord.release(event.code)
+    except OSError:
         print("Controller disconnected.")
         if silencerActive == 1:
-            GPIO.output(statusLedPin, GPIO.LOW)
-            alsaProcess.terminate()
+            led.set(False)
+            engine.active = False
             silencerActive = 0
-        connectToController()
+    finally:
+        shutdownChord.cancel()
+        gamepad.close()
 
 
 if __name__ == "__main__":